@@ -1,8 +1,81 @@
 import tkinter as tk
 from tkinter import simpledialog, messagebox
-import csv
 import math
-from collections import Counter
+
+from candidates import CandidateSet
+from solver import calculate_weighted_avg_log, load_precomputed_logs, suggest_correction
+from wordlists import bucket_index
+
+class VirtualWordList:
+    # Listbox that only holds the rows currently in view. The model is an array of indices
+    # into the bucket's word list, so the cost of an update depends on the height of the
+    # list and not on the number of remaining words.
+    def __init__(self, master, words, word_logs, height=15, **options):
+        self.words = words
+        self.word_logs = word_logs
+        self.indices = list(range(len(words)))
+        self.height = height
+        self.offset = 0
+        self.rows = []  # Text currently shown in each listbox row
+
+        self.listbox = tk.Listbox(master, height=height, exportselection=False, **options)
+        self.listbox.pack(side=tk.LEFT, fill=tk.Y)
+
+        # The scrollbar moves the window over the model instead of scrolling the listbox
+        self.scrollbar = tk.Scrollbar(master, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.listbox.bind("<MouseWheel>", lambda event: self.scroll_to(self.offset - event.delta // 120))
+        self.listbox.bind("<Button-4>", lambda event: self.scroll_to(self.offset - 1))
+        self.listbox.bind("<Button-5>", lambda event: self.scroll_to(self.offset + 1))
+
+    def set_indices(self, indices):
+        # Show a new set of word indices, keeping the current scroll position where possible
+        self.indices = indices
+        self.scroll_to(self.offset)
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, len(self.indices) - self.height))
+        self.render()
+        return "break"
+
+    def on_scroll(self, action, *args):
+        if action == "moveto":
+            self.scroll_to(int(float(args[0]) * len(self.indices)))
+        elif action == "scroll":
+            step = self.height if args[1] == "pages" else 1
+            self.scroll_to(self.offset + int(args[0]) * step)
+
+    def render(self):
+        visible = [
+            f"{self.words[i]} - {round(self.word_logs[self.words[i]], 2)}"
+            for i in self.indices[self.offset:self.offset + self.height]
+        ]
+
+        # Only rewrite the rows that changed and drop the rows that are no longer needed
+        for row, text in enumerate(visible):
+            if row < len(self.rows):
+                if self.rows[row] == text:
+                    continue
+                self.listbox.delete(row)
+            self.listbox.insert(row, text)
+        if len(self.rows) > len(visible):
+            self.listbox.delete(len(visible), tk.END)
+        self.rows = visible
+        self.listbox.selection_clear(0, tk.END)
+
+        total = len(self.indices)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.height) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def selected_index(self):
+        # Index of the selected word in the bucket's word list, or None
+        selection = self.listbox.curselection()
+        if not selection:
+            return None
+        return self.indices[self.offset + selection[0]]
 
 class LingoGUI:
     def __init__(self, root):
@@ -13,7 +86,9 @@ class LingoGUI:
         self.word_length = 5  # Default to 5-letter words
         self.first_letter = ''
         self.possible_words = []
-        self.remaining_words = []
+        self.candidates = None
+        self.history = []
+        self.pattern_index = None
         self.word_logs = {}
 
         # Feedback related
@@ -60,9 +135,15 @@ class LingoGUI:
 
     def load_words(self):
         # Load precomputed word logs
-        self.word_logs = self.load_precomputed_logs(self.first_letter, self.word_length)
-        self.possible_words = list(self.word_logs.keys())
-        self.remaining_words = self.possible_words.copy()
+        try:
+            self.word_logs = load_precomputed_logs(self.first_letter, self.word_length)
+        except FileNotFoundError as e:
+            messagebox.showerror("File Not Found", f"Precomputed file {e.filename} not found!")
+            self.word_logs = {}
+        self.pattern_index = bucket_index(self.word_length, self.first_letter, self.word_logs)
+        self.possible_words = self.pattern_index.words
+        self.candidates = CandidateSet.full(self.pattern_index)
+        self.history = []
 
     def setup_board(self):
         # Create a board for letters
@@ -105,18 +186,12 @@ class LingoGUI:
         self.word_list_frame = tk.Frame(self.container)
         self.word_list_frame.pack(side=tk.LEFT, padx=10)
 
-        self.word_listbox = tk.Listbox(self.word_list_frame, font=("Arial", 12), width=20, height=15)
-        self.word_listbox.pack(side=tk.LEFT, fill=tk.Y)
-
-        # Add scrollbar
-        scrollbar = tk.Scrollbar(self.word_list_frame, orient="vertical")
-        scrollbar.config(command=self.word_listbox.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.word_listbox.config(yscrollcommand=scrollbar.set)
+        self.word_list = VirtualWordList(self.word_list_frame, self.possible_words, self.word_logs,
+                                         font=("Arial", 12), width=20, height=15)
 
         # Display words with log values
         self.update_word_list()
-        self.word_listbox.bind('<<ListboxSelect>>', self.on_word_selected)
+        self.word_list.listbox.bind('<<ListboxSelect>>', self.on_word_selected)
 
     def create_info_display(self):
         # Create info display
@@ -130,7 +205,7 @@ class LingoGUI:
 
     def update_info_display(self):
         # Show remaining possibilities and bits of information
-        num_possibilities = len(self.remaining_words)
+        num_possibilities = len(self.candidates)
         bits_info = round(math.log2(num_possibilities), 2) if num_possibilities > 0 else 0
         self.info_label.config(text=f"Possibilities: {num_possibilities}\nBits of Info: {bits_info}")
 
@@ -153,17 +228,14 @@ class LingoGUI:
 
     def update_word_list(self):
         # Update the list of possible words
-        self.word_listbox.delete(0, tk.END)
-        for word in self.remaining_words:
-            log_info = round(self.word_logs[word], 2)
-            self.word_listbox.insert(tk.END, f"{word} - {log_info}")
+        self.word_list.set_indices(self.candidates.indices())
 
     def on_word_selected(self, event):
         # Handle word selection
-        if not self.word_listbox.curselection():
+        index = self.word_list.selected_index()
+        if index is None:
             return
-        index = self.word_listbox.curselection()[0]
-        selected_word = self.word_listbox.get(index).split(" - ")[0]
+        selected_word = self.possible_words[index]
 
         for i, letter in enumerate(selected_word):
             self.letter_vars[i].set(letter.upper())
@@ -184,16 +256,33 @@ class LingoGUI:
 
         feedback_str = "".join(map(str, self.feedback))  # Convert feedback to string format (e.g., "21020")
         selected_word = "".join(var.get().lower() for var in self.letter_vars)  # Get the current guess
+        if len(selected_word) != self.word_length:
+            messagebox.showwarning("Incomplete Guess", f"Pick a {self.word_length} letter word from the list first.")
+            return
 
         # Filter the remaining words based on feedback
-        self.remaining_words = self.filter_words(self.remaining_words, selected_word, feedback_str)
-
-        if not self.remaining_words:
-            messagebox.showerror("No Words", "No possible words left. Please check the feedback.")
-            return
+        remaining = self.candidates.filter(selected_word, feedback_str)
+        self.history.append((selected_word, feedback_str))
+
+        if not remaining:
+            # Propose the smallest change to the feedback that leaves possible words
+            suggestion = suggest_correction(self.pattern_index, self.history)
+            self.history.pop()
+            corrected = ", ".join(f"{guess.upper()} {feedback}" for guess, feedback in suggestion["history"])
+            if not messagebox.askyesno(
+                "No Words",
+                f"No possible words left. Did you mean {corrected}?\n"
+                f"That leaves {len(suggestion['words'])} possible words.",
+            ):
+                return
+            remaining = CandidateSet.from_words(self.pattern_index, suggestion["words"])
+            self.history = suggestion["history"]
+
+        self.candidates = remaining
 
         # Calculate the next best guess
-        next_guess, _ = self.calculate_weighted_avg_log(self.remaining_words, self.remaining_words)
+        words = self.candidates.words()
+        next_guess, _ = calculate_weighted_avg_log(words, words)
         self.update_word_list()  # Update the list of possible words
         self.update_info_display()  # Update the possibilities info display
 
@@ -203,91 +292,6 @@ class LingoGUI:
         self.feedback = [0] * self.word_length  # Reset feedback for next round
         self.update_feedback_display_all()
 
-    # Modified filter and calculation functions
-    def filter_words(self, possible_words, guess, feedback):
-        filtered_words = []
-
-        for word in possible_words:
-            solution_list = list(word)
-            guess_list = list(guess)
-            matches = [0] * len(guess)
-
-            # First pass: Check exact matches (2)
-            for i in range(len(guess)):
-                if guess_list[i] == solution_list[i]:
-                    matches[i] = 2
-                    solution_list[i] = None  # Mark as used
-
-            # Second pass: Check partial matches (1)
-            for i in range(len(guess)):
-                if matches[i] == 0 and guess_list[i] in solution_list:
-                    matches[i] = 1
-                    solution_list[solution_list.index(guess_list[i])] = None  # Mark as used
-
-            # Convert matches to string and compare with feedback
-            if "".join(map(str, matches)) == feedback:
-                filtered_words.append(word)
-
-        return filtered_words
-
-    def calculate_weighted_avg_log(self, remaining_solutions, guesses):
-        guess_analysis = {guess: Counter() for guess in guesses}
-
-        # Compute feedback for every guess-solution combination
-        for solution in remaining_solutions:
-            for guess in guesses:
-                solution_list = list(solution)
-                guess_list = list(guess)
-                feedback = ["0"] * len(guess)
-
-                # First pass: Check exact matches (2)
-                for i in range(len(guess)):
-                    if guess_list[i] == solution_list[i]:
-                        feedback[i] = "2"
-                        solution_list[i] = None  # Mark as used
-
-                # Second pass: Check partial matches (1)
-                for i in range(len(guess)):
-                    if feedback[i] == "0" and guess_list[i] in solution_list:
-                        feedback[i] = "1"
-                        solution_list[solution_list.index(guess_list[i])] = None  # Mark as used
-
-                feedback_str = "".join(feedback)
-                guess_analysis[guess].update([feedback_str])
-
-        # Compute weighted averages
-        guess_weighted_logs = {}
-        for guess, counts in guess_analysis.items():
-            total = sum(counts.values())
-            fractions = {result: count / total for result, count in counts.items()}
-            logs = {result: math.log2(1 / fraction) for result, fraction in fractions.items()}
-
-            # Weighted average of logs
-            weighted_avg_log = sum(fraction * logs[result] for result, fraction in fractions.items())
-            guess_weighted_logs[guess] = weighted_avg_log
-
-        # Return the best guess based on the highest weighted average log
-        best_guess = max(guess_weighted_logs, key=guess_weighted_logs.get)
-        return best_guess, guess_weighted_logs
-    def load_precomputed_logs(self, first_letter, word_length):
-        # Loads the precomputed log scores for the words starting with the given letter and length.
-        if word_length == 5:
-            log_file = f"five_letter_logs_{first_letter}.csv"
-        else:
-            log_file = f"six_letter_logs_{first_letter}.csv"
-        word_logs = {}
-
-        try:
-            with open(log_file, newline='', encoding='utf-8') as csvfile:
-                reader = csv.reader(csvfile)
-                next(reader)  # Skip the header row
-                for row in reader:
-                    word_logs[row[0]] = float(row[1])  # word, log_score
-        except FileNotFoundError:
-            messagebox.showerror("File Not Found", f"Precomputed file {log_file} not found!")
-
-        return word_logs
-
 if __name__ == "__main__":
     root = tk.Tk()
     app = LingoGUI(root)
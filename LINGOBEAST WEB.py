@@ -1,7 +1,13 @@
 import streamlit as st
 import csv
-import math
-from collections import Counter
+
+import metrics
+import residency
+import warmup
+from candidates import CandidateSet
+from global_mode import global_next_guess, load_global_game
+from ranking import Ranking
+from solver import suggest_correction
 
 st.set_page_config(page_title="LingoBeast", page_icon="🦅")
 
@@ -31,6 +37,7 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@metrics.instrument("load_precomputed_logs")
 def load_precomputed_logs(first_letter, word_length):
     if word_length == 5:
         log_file = f"five_letter_logs_{first_letter}.csv"
@@ -49,86 +56,87 @@ def load_precomputed_logs(first_letter, word_length):
         return {}
     return word_logs
 
-def filter_words(possible_words, guess, feedback):
-    filtered_words = []
-    for word in possible_words:
-        solution_list = list(word)
-        guess_list = list(guess)
-        matches = [0] * len(guess)
-
-        for i in range(len(guess)):
-            if guess_list[i] == solution_list[i]:
-                matches[i] = 2
-                solution_list[i] = None 
-
-        for i in range(len(guess)):
-            if matches[i] == 0 and guess_list[i] in solution_list:
-                matches[i] = 1
-                solution_list[solution_list.index(guess_list[i])] = None 
-
-        if "".join(map(str, matches)) == feedback:
-            filtered_words.append(word)
-    return filtered_words
-
-def calculate_weighted_avg_log(remaining_solutions, guesses):
-    guess_analysis = {guess: Counter() for guess in guesses}
-    
-    if len(remaining_solutions) > 500:
-         guesses_to_check = guesses[:500]
-    else:
-         guesses_to_check = guesses
-
-    for solution in remaining_solutions:
-        for guess in guesses_to_check:
-            solution_list = list(solution)
-            guess_list = list(guess)
-            feedback = ["0"] * len(guess)
-            
-            for i in range(len(guess)):
-                if guess_list[i] == solution_list[i]:
-                    feedback[i] = "2"
-                    solution_list[i] = None
-
-            for i in range(len(guess)):
-                if feedback[i] == "0" and guess_list[i] in solution_list:
-                    feedback[i] = "1"
-                    solution_list[solution_list.index(guess_list[i])] = None
-
-            guess_analysis[guess].update(["".join(feedback)])
-
-    guess_weighted_logs = {}
-    for guess, counts in guess_analysis.items():
-        total = sum(counts.values())
-        fractions = {result: count / total for result, count in counts.items()}
-        logs = {result: math.log2(1 / fraction) for result, fraction in fractions.items()}
-        weighted_avg_log = sum(fraction * logs[result] for result, fraction in fractions.items())
-        guess_weighted_logs[guess] = weighted_avg_log
-
-    if not guess_weighted_logs:
-        return None, {}
-        
-    best_guess = max(guess_weighted_logs, key=guess_weighted_logs.get)
-    return best_guess, guess_weighted_logs
-
 st.title("LINGOBEAST")
 
 if 'step' not in st.session_state:
     st.session_state.step = 1
-if 'possible_words' not in st.session_state:
-    st.session_state.possible_words = []
+if 'candidates' not in st.session_state:
+    st.session_state.candidates = None
 if 'current_guess' not in st.session_state:
     st.session_state.current_guess = ""
 if 'feedback_colors' not in st.session_state:
     st.session_state.feedback_colors = [] 
-if 'latest_scores' not in st.session_state:
-    st.session_state.latest_scores = {}
+if 'ranking' not in st.session_state:
+    st.session_state.ranking = Ranking()
+if 'turn_timings' not in st.session_state:
+    st.session_state.turn_timings = []
+if 'history' not in st.session_state:
+    st.session_state.history = []
+if 'suggestion' not in st.session_state:
+    st.session_state.suggestion = None
+
+# Starts the warm-up when the app was not launched through serve.py
+warmup.start()
+
+@st.cache_resource
+def get_global_game(length):
+    # The global index and opener table are shared by every session
+    return warmup.global_game(length) or load_global_game(length)
+
+def load_bucket(length, first_letter):
+    # The bucket from the residency manager, or None when it has no logs
+    try:
+        return residency.manager().get(length, first_letter)
+    except FileNotFoundError:
+        return None
+
+def get_bucket():
+    # The bucket of this game, None in a whole-dictionary game
+    if not st.session_state.first_letter:
+        return None
+    return load_bucket(st.session_state.length, st.session_state.first_letter)
+
+def get_vocabulary():
+    # The words the candidates of this game are a subset of: its bucket or the global index
+    bucket = get_bucket()
+    if bucket:
+        return bucket
+    index, _ = get_global_game(st.session_state.length)
+    return index
+
+def get_candidates():
+    # The candidates over the current vocabulary, which changes when the bucket was evicted and reloaded
+    st.session_state.candidates = st.session_state.candidates.on(get_vocabulary())
+    return st.session_state.candidates
+
+def initial_colors():
+    # The given first letter is always green, without it every tile starts grey
+    if st.session_state.first_letter:
+        return [2] + [0] * (st.session_state.length - 1)
+    return [0] * st.session_state.length
 
 def cycle_color(index):
     st.session_state.feedback_colors[index] = (st.session_state.feedback_colors[index] + 1) % 3
 
 def switch_word(new_word):
     st.session_state.current_guess = new_word
-    st.session_state.feedback_colors = [2] + [0] * (st.session_state.length - 1)
+    st.session_state.feedback_colors = initial_colors()
+
+def next_guess(events):
+    with st.spinner("Beast is aan het rekenen..."):
+        with metrics.turn() as score_events:
+            candidates = get_candidates()
+            if st.session_state.first_letter:
+                best, scores = candidates.vocabulary.next_guess(st.session_state.history, candidates)
+            else:
+                index, table = get_global_game(st.session_state.length)
+                best, scores = global_next_guess(index, table, st.session_state.history, candidates.words())
+        events.extend(score_events)
+
+    st.session_state.current_guess = best
+    st.session_state.ranking = Ranking(scores)
+    st.session_state.feedback_colors = initial_colors()
+    st.rerun()
 
 if st.session_state.step == 1:
     st.write("Raad een nieuw woord:")
@@ -137,25 +145,47 @@ if st.session_state.step == 1:
         length = st.radio("Aantal letters", [5, 6])
     with col2:
         first_letter = st.text_input("Eerste letter", max_chars=1).lower()
+    whole_dictionary = st.checkbox("Eerste letter onbekend (hele woordenboek)")
 
     if st.button("🚀 Start Beast"):
-        if first_letter and len(first_letter) == 1:
+        if whole_dictionary:
+            st.session_state.length = length
+            st.session_state.first_letter = ""
+
+            with metrics.turn() as events:
+                index, table = get_global_game(length)
+                opener, scores = global_next_guess(index, table, [], index.words)
+            st.session_state.turn_timings = [events]
+            st.session_state.candidates = CandidateSet.full(index)
+            st.session_state.history = []
+            st.session_state.suggestion = None
+            st.session_state.ranking = Ranking(scores)
+            st.session_state.current_guess = opener
+            st.session_state.feedback_colors = initial_colors()
+            st.session_state.step = 2
+            st.rerun()
+        elif first_letter and len(first_letter) == 1:
             st.session_state.length = length
             st.session_state.first_letter = first_letter
             
-            logs = load_precomputed_logs(first_letter, length)
+            with metrics.turn() as events:
+                bucket = load_bucket(length, first_letter)
+                logs = bucket.word_logs if bucket else load_precomputed_logs(first_letter, length)
+            st.session_state.turn_timings = [events]
             if logs:
-                st.session_state.possible_words = list(logs.keys())
-                st.session_state.latest_scores = logs
-                st.session_state.current_guess = max(logs, key=logs.get)
-                st.session_state.feedback_colors = [2] + [0] * (length - 1)
+                st.session_state.candidates = CandidateSet.full(bucket)
+                st.session_state.history = []
+                st.session_state.suggestion = None
+                st.session_state.ranking = Ranking(logs)
+                st.session_state.current_guess = bucket.opener
+                st.session_state.feedback_colors = initial_colors()
                 st.session_state.step = 2
                 st.rerun()
         else:
             st.warning("Vul een geldige letter in.")
 
 elif st.session_state.step == 2:
-    st.write(f"**{len(st.session_state.possible_words)}** woorden over.")
+    st.write(f"**{len(st.session_state.candidates)}** woorden over.")
     
     st.markdown("### Huidige gok:")
     cols = st.columns(st.session_state.length)
@@ -174,8 +204,7 @@ elif st.session_state.step == 2:
             
         col.button(display_text, key=f"btn_{i}", on_click=cycle_color, args=(i,))
 
-    sorted_scores = sorted(st.session_state.latest_scores.items(), key=lambda x: x[1], reverse=True)
-    alternatives = [item for item in sorted_scores if item[0] != st.session_state.current_guess][:5]
+    alternatives = st.session_state.ranking.top(5, exclude=(st.session_state.current_guess,))
 
     if alternatives:
         st.markdown("---")
@@ -199,27 +228,50 @@ elif st.session_state.step == 2:
                 st.session_state.step = 1
                 st.rerun()
         else:
-            st.session_state.possible_words = filter_words(
-                st.session_state.possible_words, 
-                st.session_state.current_guess, 
-                feedback_str
-            )
+            with metrics.turn() as events:
+                remaining = get_candidates().filter(st.session_state.current_guess, feedback_str)
+            st.session_state.turn_timings.append(events)
+            st.session_state.history.append((st.session_state.current_guess, feedback_str))
             
-            if not st.session_state.possible_words:
-                st.error("Geen woorden meer mogelijk! Heb je de feedback goed ingevuld?")
+            if not remaining:
+                # Keep the current words and propose the most likely typo instead of giving up
+                with metrics.turn() as recovery_events:
+                    vocabulary = get_vocabulary()
+                    index = vocabulary.index if st.session_state.first_letter else vocabulary
+                    st.session_state.suggestion = suggest_correction(index, st.session_state.history)
+                events.extend(recovery_events)
+                st.session_state.history.pop()
             else:
-                with st.spinner("Beast is aan het rekenen..."):
-                    best, scores = calculate_weighted_avg_log(st.session_state.possible_words, st.session_state.possible_words)
-                    
-                    st.session_state.current_guess = best
-                    st.session_state.latest_scores = scores
-                    st.session_state.feedback_colors = [2] + [0] * (st.session_state.length - 1)
-                    st.rerun()
+                st.session_state.candidates = remaining
+                st.session_state.suggestion = None
+                next_guess(events)
+
+    if st.session_state.suggestion:
+        suggestion = st.session_state.suggestion
+        st.error("Geen woorden meer mogelijk! Heb je de feedback goed ingevuld?")
+        corrected = ", ".join(f"{guess.upper()} {feedback}" for guess, feedback in suggestion["history"])
+        st.write(f"Bedoelde je **{corrected}**? Dan zijn er nog {len(suggestion['words'])} woorden mogelijk.")
+        if st.button("🩹 Correctie toepassen"):
+            st.session_state.candidates = CandidateSet.from_words(get_vocabulary(), suggestion["words"])
+            st.session_state.history = suggestion["history"]
+            st.session_state.suggestion = None
+            events = []
+            st.session_state.turn_timings.append(events)
+            next_guess(events)
 
     if st.button("Spel Resetten"):
         st.session_state.step = 1
         st.rerun()
 
+    with st.expander("🛠️ Debug: tijden per beurt"):
+        st.caption(f"Warm-up: {warmup.start().report()}")
+        st.caption(f"Geheugen: {residency.manager().report()}")
+        for turn_number, events in enumerate(st.session_state.turn_timings, start=1):
+            total_ms = sum(event["ms"] for event in events)
+            st.write(f"**Beurt {turn_number}** — {total_ms:.1f} ms")
+            if events:
+                st.table(events)
+
 st.markdown("---")
 st.markdown(
     """
@@ -1,102 +1,7 @@
-import csv
-import math
-from collections import Counter
-
-
-def load_precomputed_logs(first_letter, word_length):
-    """
-    Loads the precomputed log scores for the words starting with the given letter and length.
-    """
-    if word_length == 5:
-        log_file = f"five_letter_logs_{first_letter}.csv"
-    else:
-        log_file = f"six_letter_logs_{first_letter}.csv"
-    word_logs = {}
-
-    # Read precomputed logs
-    with open(log_file, "r") as csvfile:
-        reader = csv.reader(csvfile)
-        next(reader)  # Skip the header row
-
-        for row in reader:
-            word_logs[row[0]] = float(row[1])  # {word: log_score}
-
-    return word_logs
-
-
-def filter_words(possible_words, guess, feedback):
-    """
-    Filters the list of possible words based on feedback from the last guess.
-    Feedback is a string of 0, 1, 2 indicating correctness of each position.
-    """
-    filtered_words = []
-
-    for word in possible_words:
-        solution_list = list(word)
-        guess_list = list(guess)
-        matches = [0] * len(guess)
-
-        # First pass: Check exact matches (2)
-        for i in range(len(guess)):
-            if guess_list[i] == solution_list[i]:
-                matches[i] = 2
-                solution_list[i] = None  # Mark as used
-
-        # Second pass: Check partial matches (1)
-        for i in range(len(guess)):
-            if matches[i] == 0 and guess_list[i] in solution_list:
-                matches[i] = 1
-                solution_list[solution_list.index(guess_list[i])] = None  # Mark as used
-
-        # Convert matches to string and compare with feedback
-        if "".join(map(str, matches)) == feedback:
-            filtered_words.append(word)
-
-    return filtered_words
-
-
-def calculate_weighted_avg_log(remaining_solutions, guesses):
-    """
-    Recalculates the log scores for each guess based on the remaining possible solutions.
-    """
-    guess_analysis = {guess: Counter() for guess in guesses}
-
-    # Compute feedback for every guess-solution combination
-    for solution in remaining_solutions:
-        for guess in guesses:
-            solution_list = list(solution)
-            guess_list = list(guess)
-            feedback = ["0"] * len(guess)
-
-            # First pass: Check exact matches (2)
-            for i in range(len(guess)):
-                if guess_list[i] == solution_list[i]:
-                    feedback[i] = "2"
-                    solution_list[i] = None  # Mark as used
-
-            # Second pass: Check partial matches (1)
-            for i in range(len(guess)):
-                if feedback[i] == "0" and guess_list[i] in solution_list:
-                    feedback[i] = "1"
-                    solution_list[solution_list.index(guess_list[i])] = None  # Mark as used
-
-            feedback_str = "".join(feedback)
-            guess_analysis[guess].update([feedback_str])
-
-    # Compute weighted averages
-    guess_weighted_logs = {}
-    for guess, counts in guess_analysis.items():
-        total = sum(counts.values())
-        fractions = {result: count / total for result, count in counts.items()}
-        logs = {result: math.log2(1 / fraction) for result, fraction in fractions.items()}
-
-        # Weighted average of logs
-        weighted_avg_log = sum(fraction * logs[result] for result, fraction in fractions.items())
-        guess_weighted_logs[guess] = weighted_avg_log
-
-    # Return the best guess based on the highest weighted average log
-    best_guess = max(guess_weighted_logs, key=guess_weighted_logs.get)
-    return best_guess, guess_weighted_logs
+from global_mode import candidates_after, global_next_guess, load_global_game
+from solver import (calculate_weighted_avg_log, feedback_error, filter_words, load_precomputed_logs, opening_guess,
+                    suggest_correction)
+from wordlists import bucket_index
 
 
 def play_lingo():
@@ -109,16 +14,23 @@ def play_lingo():
         word_length = int(word_length)
 
         # User input for the first letter
-        first_letter = input("Wat is de eerste gegeven letter: ").lower()
+        first_letter = input("Wat is de eerste gegeven letter (leeg als die niet gegeven is): ").strip().lower()
+        history = []
 
-        # Load precomputed logs for the given starting letter and word length
-        word_logs = load_precomputed_logs(first_letter, word_length)
+        if first_letter:
+            # Load precomputed logs for the given starting letter and word length
+            word_logs = load_precomputed_logs(first_letter, word_length)
+            index = bucket_index(word_length, first_letter, word_logs)
 
-        possible_words = list(word_logs.keys())
-
-        # Use the word with the highest log score as the first guess
-        current_guess = max(word_logs, key=word_logs.get)
+            possible_words = index.words
 
+            # Use the bucket's opener as the first guess
+            current_guess = opening_guess(first_letter, word_length, word_logs)
+        else:
+            # Without a first letter play on the whole dictionary with the global index
+            index, table = load_global_game(word_length)
+            possible_words = index.words
+            current_guess, _ = global_next_guess(index, table, history, possible_words)
 
         # Iteratively refine the guess based on feedback
         while True:
@@ -126,16 +38,35 @@ def play_lingo():
             if feedback == "22222":
                 print("Gefeliciteerd, we hebben 'm.")
                 break
+            error = feedback_error(feedback, word_length)
+            if error:
+                print(error)
+                continue
 
             # Filter remaining possible solutions based on feedback
-            possible_words = filter_words(possible_words, current_guess, feedback)
+            history.append((current_guess, feedback))
+            if first_letter:
+                possible_words = filter_words(possible_words, current_guess, feedback)
+            else:
+                possible_words = candidates_after(index, history)
 
             if not possible_words:
                 print("Geen woorden mogelijk, check of de feedback klopt.")
-                break
+
+                # Propose the smallest change to the feedback that leaves possible words
+                suggestion = suggest_correction(index, history)
+                corrected = ", ".join(f"{guess.upper()} {feedback}" for guess, feedback in suggestion["history"])
+                answer = input(f"Bedoelde je {corrected}? ({len(suggestion['words'])} woorden mogelijk) (ja/nee): ")
+                if answer.strip().lower() != "ja":
+                    break
+                possible_words = suggestion["words"]
+                history = suggestion["history"]
 
             # Recalculate logs for remaining words
-            best_guess, _ = calculate_weighted_avg_log(possible_words, possible_words)
+            if first_letter:
+                best_guess, _ = calculate_weighted_avg_log(possible_words, possible_words)
+            else:
+                best_guess, _ = global_next_guess(index, table, history, possible_words)
             current_guess = best_guess
             print(f"Volgende beste gok: {current_guess}")
 
@@ -1,24 +1,38 @@
 import csv
+import json
+import os
 from collections import Counter
 
+from self_play_stats import summary_file, write_frequencies
+
 
 def analyze_guess_frequencies(word_length):
-    # File to read results from
+    # Self-play keeps the histogram up to date in its summary file while it plays
+    summary_path = summary_file(word_length)
+    # File to read results from when there is no summary (yet)
     input_file = f"lingo_results_{word_length}_letters.csv"
 
     # Counter to store the frequency of each number of guesses
     guess_counter = Counter()
 
-    try:
-        with open(input_file, "r") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                attempts = int(row["attempts"])
-                guess_counter[attempts] += 1
-
-    except FileNotFoundError:
-        print(f"Error: {input_file} not found.")
-        return
+    if os.path.exists(summary_path) and (not os.path.exists(input_file)
+                                         or os.path.getmtime(summary_path) >= os.path.getmtime(input_file)):
+        with open(summary_path, "r") as summary:
+            data = json.load(summary)
+        guess_counter.update({int(attempts): frequency for attempts, frequency in data["histogram"].items()})
+        if not data["finished"]:
+            print(f"Self-play is still running: {data['games']} of {data['total']} games played.")
+    else:
+        try:
+            with open(input_file, "r") as csvfile:
+                reader = csv.DictReader(csvfile)
+                for row in reader:
+                    attempts = int(row["attempts"])
+                    guess_counter[attempts] += 1
+
+        except FileNotFoundError:
+            print(f"Error: {input_file} not found.")
+            return
 
     # Display the frequency of each number of guesses
     print(f"Frequency of guesses for {word_length}-letter words:")
@@ -26,12 +40,7 @@ def analyze_guess_frequencies(word_length):
         print(f"{attempts} guesses: {frequency} times")
 
     # Optionally, save results to a CSV file
-    output_file = f"guess_frequencies_{word_length}_letters.csv"
-    with open(output_file, "w", newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["Number of Guesses", "Frequency"])
-        for attempts, frequency in sorted(guess_counter.items()):
-            writer.writerow([attempts, frequency])
+    output_file = write_frequencies(word_length, guess_counter)
 
     print(f"Frequency analysis saved to {output_file}.\n")
 
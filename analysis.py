@@ -1,13 +1,14 @@
 import csv
-from collections import Counter
-import math
+
+from ranking import Ranking
+from results_store import ResultsStore
 
 def analyze_csv_weighted_avg_log(file_path, output_csv):
     """
-    Reads the CSV file, calculates the fraction of each result string for each guessed word,
-    computes log2(1/fraction) for each fraction, and then calculates the weighted average
-    of the logs for each guess. Sorts the results by the highest weighted average log and
-    saves to an output CSV.
+    Reads the results of the CSV file from its columnar store (converting the CSV on first
+    use), calculates for each guessed word the weighted average of log2(1/fraction) over
+    the fractions of its result strings, sorts the results by the highest weighted average
+    log and saves them to an output CSV.
 
     Args:
     - file_path (str): Path to the input CSV file.
@@ -16,37 +17,10 @@ def analyze_csv_weighted_avg_log(file_path, output_csv):
     Returns:
     - None
     """
-    guess_analysis = {}
-
-    # Read the CSV file
-    with open(file_path, "r") as csvfile:
-        reader = csv.reader(csvfile)
-        header = next(reader)  # Skip the header row
-
-        # Process each row in the CSV
-        for row in reader:
-            guess = row[0]  # The guessed word
-            results = row[1:]  # The result strings for this guess
-
-            # Count occurrences of each string for this guess
-            if guess not in guess_analysis:
-                guess_analysis[guess] = Counter()
-
-            guess_analysis[guess].update(results)
-
-    # Compute weighted averages of logs
-    guess_weighted_logs = {}
-    for guess, counts in guess_analysis.items():
-        total = sum(counts.values())
-        fractions = {result: count / total for result, count in counts.items()}
-        logs = {result: math.log2(1 / fraction) for result, fraction in fractions.items()}
-
-        # Weighted average of logs
-        weighted_avg_log = sum(fraction * logs[result] for result, fraction in fractions.items())
-        guess_weighted_logs[guess] = weighted_avg_log
+    guess_weighted_logs = ResultsStore.from_results(file_path).weighted_avg_logs()
 
     # Sort guesses by weighted average log in descending order
-    sorted_guesses = sorted(guess_weighted_logs.items(), key=lambda x: x[1], reverse=True)
+    sorted_guesses = Ranking(guess_weighted_logs).ranked()
 
     # Save the weighted average logs to a CSV
     with open(output_csv, "w", newline="") as outfile:
@@ -0,0 +1,223 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import residency
+from solver import FIRST_LETTERS, feedback_error, solve_state
+
+# States per task: small enough to spread a bucket over the workers,
+# large enough that every task reuses the bucket its worker already loaded.
+CHUNK_SIZE = 64
+
+def get_bucket(first_letter, word_length):
+    """
+    Returns a bucket through the residency manager of this process.
+    """
+    return residency.manager().get(word_length, first_letter)
+
+
+def preload_buckets(word_lengths=(5, 6)):
+    """
+    Loads every available bucket into this process, for example as a worker initializer.
+    Beyond the budget of the residency manager the least recently loaded ones are evicted again.
+    """
+    for word_length in word_lengths:
+        for first_letter in FIRST_LETTERS:
+            try:
+                get_bucket(first_letter, word_length)
+            except FileNotFoundError:
+                continue
+
+
+def parse_history(text):
+    """
+    Parses a CSV history cell such as "aries:20100 aster:22010" into (guess, feedback) pairs.
+    """
+    return [tuple(step.split(":")) for step in text.split()]
+
+
+def state_error(state):
+    """
+    Checks that every step of a state's history is a guess of the state's length with valid
+    feedback. Returns a message, or None when the state is valid.
+    """
+    for step in state["history"]:
+        if len(step) != 2:
+            return f"Ongeldige stap {':'.join(step)}: verwacht gok:feedback."
+        guess, feedback = step
+        if len(guess) != state["length"]:
+            return f"Gok '{guess}' heeft geen {state['length']} letters."
+        error = feedback_error(feedback, state["length"])
+        if error:
+            return error
+    return None
+
+
+def error_result(error):
+    return {"guess": None, "candidates": 0, "error": error}
+
+
+def parse_state(record):
+    """
+    Turns a JSON object or CSV row into a state; the history is a list of [guess, feedback]
+    steps or a CSV history cell. A record that cannot be read, or whose history is invalid
+    (see `state_error`), gets an "error" and is not solved.
+    """
+    if not isinstance(record, dict):
+        return invalid_state({}, f"verwacht een object, niet {record!r}")
+    try:
+        history = record.get("history") or []
+        if isinstance(history, str):
+            history = parse_history(history)
+        state = {**record, "first_letter": record["first_letter"].lower(), "length": int(record["length"]),
+                 "history": [tuple(step) for step in history]}
+        error = state_error(state)
+    except (AttributeError, KeyError, TypeError, ValueError) as error:
+        return invalid_state(record, repr(error))
+    if error:
+        state["error"] = error
+    return state
+
+
+def invalid_state(record, reason):
+    return {"first_letter": None, "length": None, "history": None, **record, "error": f"Ongeldige toestand: {reason}"}
+
+
+def read_states(file_path):
+    """
+    Reads puzzle states from a JSONL or CSV file.
+    JSONL lines look like {"first_letter": "a", "length": 5, "history": [["aries", "20100"]]},
+    CSV files have the columns first_letter, length and history (see `parse_history`).
+    A line or row that is not a valid state becomes a state with an "error" (see `parse_state`).
+    """
+    states = []
+    with open(file_path, "r", encoding="utf-8") as infile:
+        if file_path.endswith(".csv"):
+            for row in csv.DictReader(infile):
+                states.append(parse_state({name: row[name] for name in ("first_letter", "length", "history")
+                                           if row.get(name) is not None}))
+        else:
+            for line in infile:
+                if line.strip():
+                    try:
+                        states.append(parse_state(json.loads(line)))
+                    except ValueError as error:
+                        states.append(invalid_state({}, f"geen geldige JSON ({error})"))
+    return states
+
+
+def state_key(state):
+    return state["length"], state["first_letter"], tuple(map(tuple, state["history"]))
+
+
+def solve_chunk(word_length, first_letter, histories, alternatives):
+    """
+    Solves a list of histories that all belong to the same bucket. A history that cannot be
+    solved gets an error record, the other histories are still solved.
+    """
+    if word_length in (5, 6):
+        try:
+            bucket = get_bucket(first_letter, word_length)
+        except FileNotFoundError:
+            pass
+        else:
+            word_logs = bucket.word_logs
+            results = []
+            for history in histories:
+                try:
+                    results.append(solve_state(word_logs, history, alternatives, bucket.opener, bucket.index))
+                except Exception as error:
+                    results.append(error_result(f"Kon deze toestand niet oplossen: {error!r}"))
+            return results
+    error = f"Geen bucket voor {word_length} letters en '{first_letter}'."
+    return [error_result(error) for _ in histories]
+
+
+def plan_batch(states):
+    """
+    Deduplicates identical states and splits them into per-bucket chunks; states with an
+    "error" are left out. Returns {state_key: [input indices]} and a list of
+    (word_length, first_letter, keys) chunks.
+    """
+    unique = {}
+    for index, state in enumerate(states):
+        if state.get("error"):
+            continue
+        unique.setdefault(state_key(state), []).append(index)
+
+    buckets = {}
+    for key in unique:
+        buckets.setdefault(key[:2], []).append(key)
+
+    chunks = []
+    for (word_length, first_letter), keys in buckets.items():
+        for start in range(0, len(keys), CHUNK_SIZE):
+            chunks.append((word_length, first_letter, keys[start:start + CHUNK_SIZE]))
+    return unique, chunks
+
+
+def solve_batch(states, workers=None, alternatives=0):
+    """
+    Solves many puzzle states and yields (indices, result) pairs as soon as they are done,
+    where `indices` are the positions of every input state that shares that result.
+    Identical states are solved once and states are grouped per bucket, so each worker
+    loads a bucket at most once.
+    """
+    unique, chunks = plan_batch(states)
+    for index, state in enumerate(states):
+        if state.get("error"):
+            yield [index], error_result(state["error"])
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for word_length, first_letter, keys in chunks:
+            future = executor.submit(solve_chunk, word_length, first_letter, [key[2] for key in keys], alternatives)
+            futures[future] = keys
+
+        for future in as_completed(futures):
+            for key, result in zip(futures[future], future.result()):
+                yield unique[key], result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend the next guess for many Lingo states at once.")
+    parser.add_argument("input", help="JSONL or CSV file with puzzle states")
+    parser.add_argument("-o", "--output", help="JSONL file to stream the results to (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("-a", "--alternatives", type=int, default=0, help="number of alternative guesses to include")
+    args = parser.parse_args()
+
+    states = read_states(args.input)
+    outfile = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+
+    start = time.perf_counter()
+    solved = 0
+    unique = 0
+    errors = 0
+    for indices, result in solve_batch(states, args.workers, args.alternatives):
+        # Error records are counted apart, so states/s only measures real solves
+        if result.get("error"):
+            errors += len(indices)
+        else:
+            unique += 1
+            solved += len(indices)
+        for index in indices:
+            state = states[index]
+            record = {"id": state.get("id", index), "first_letter": state["first_letter"],
+                      "length": state["length"], "history": state["history"], **result}
+            outfile.write(json.dumps(record) + "\n")
+        outfile.flush()
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        outfile.close()
+    print(f"Solved {solved} states ({unique} unique) in {elapsed:.2f} s: "
+          f"{solved / elapsed if elapsed else 0:.1f} states/s; {errors} states gave an error.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import numpy as np
+
+import metrics
+
+
+class CandidateSet:
+    """
+    The words that are still possible in a game, as a packed bitmask over a shared vocabulary
+    that is never copied: a residency Bucket or a PatternIndex, anything with `words`,
+    `position` and `row(guess)`. A set is immutable; filtering returns a new one. Sets over
+    the same vocabulary with the same words are equal and hash alike, so results computed
+    for one session can be reused by another.
+    """
+
+    __slots__ = ("vocabulary", "bits", "count", "_hash")
+
+    def __init__(self, vocabulary, bits, count):
+        self.vocabulary = vocabulary
+        self.bits = bits
+        self.count = count
+        self._hash = None
+
+    @classmethod
+    def from_mask(cls, vocabulary, mask):
+        return cls(vocabulary, np.packbits(mask).tobytes(), int(np.count_nonzero(mask)))
+
+    @classmethod
+    def full(cls, vocabulary):
+        return cls.from_mask(vocabulary, np.ones(len(vocabulary.words), dtype=bool))
+
+    @classmethod
+    def from_words(cls, vocabulary, words):
+        mask = np.zeros(len(vocabulary.words), dtype=bool)
+        mask[[vocabulary.position[word] for word in words]] = True
+        return cls.from_mask(vocabulary, mask)
+
+    def mask(self):
+        return np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8), count=len(self.vocabulary.words)).view(bool)
+
+    def indices(self):
+        """
+        Positions of the candidates in the vocabulary, in vocabulary order.
+        """
+        return np.flatnonzero(self.mask())
+
+    def words(self):
+        """
+        The candidates as a new list of words, in vocabulary order.
+        """
+        return [self.vocabulary.words[i] for i in self.indices()]
+
+    @metrics.instrument("candidates.filter", sizes=lambda self, *args: {"candidates": len(self)})
+    def filter(self, guess, feedback):
+        """
+        The candidates that give `feedback` on `guess`, the same words as `filter_words`.
+        """
+        return CandidateSet.from_mask(self.vocabulary, self.mask() & (self.vocabulary.row(guess) == int(feedback, 3)))
+
+    def on(self, vocabulary):
+        """
+        The same candidates over another vocabulary with the same words in the same order,
+        such as a bucket that was evicted and loaded again.
+        """
+        if vocabulary is self.vocabulary:
+            return self
+        return CandidateSet(vocabulary, self.bits, self.count)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.words())
+
+    def __eq__(self, other):
+        return (isinstance(other, CandidateSet) and self.vocabulary is other.vocabulary
+                and self.bits == other.bits)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((id(self.vocabulary), self.bits))
+        return self._hash
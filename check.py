@@ -4,31 +4,17 @@ import string
 from collections import Counter
 import math
 
+from ranking import Ranking
+from wordlists import load_word_lists
 
-# Function to read words and categorize them by starting character (a-z, 1)
-def categorize_words_by_start(file_path):
-    # Create categories for each letter (a-z) and '1'
-    categorized_words = {char: [] for char in string.ascii_lowercase + "1"}
 
-    with open(file_path) as f:
-        lines = [line.strip() for line in f if line.strip()]
-
-    for word in lines:
-        first_char = word[0].lower()
-        if first_char in categorized_words:
-            categorized_words[first_char].append(word)
-
-    return categorized_words
-
-
-# Categorize six-letter solutions and guesses
-six_letter_solutions_by_start = categorize_words_by_start('possible_six_letter_solutions.txt')
-six_letter_guesses_by_start = categorize_words_by_start('possible_six_letter_guesses.txt')
+# Six-letter solutions and guesses, normalized, deduplicated and partitioned by starting character (a-z, 1)
+six_letter_lists = load_word_lists(6)
 
 # Process and write CSV for each starting character
 for char in string.ascii_lowercase + "1":
-    solutions = six_letter_solutions_by_start[char]
-    guesses = six_letter_guesses_by_start[char]
+    solutions = six_letter_lists.solutions(char)
+    guesses = six_letter_lists.guesses(char)
 
     if not solutions or not guesses:
         continue  # Skip if there are no words for this starting character
@@ -105,7 +91,7 @@ def analyze_csv_weighted_avg_log(file_path, output_csv):
         guess_weighted_logs[guess] = weighted_avg_log
 
     # Sort guesses by weighted average log in descending order
-    sorted_guesses = sorted(guess_weighted_logs.items(), key=lambda x: x[1], reverse=True)
+    sorted_guesses = Ranking(guess_weighted_logs).ranked()
 
     # Save the weighted average logs to a CSV
     with open(output_csv, "w", newline="") as outfile:
@@ -0,0 +1,62 @@
+import hashlib
+import json
+import os
+
+import metrics
+from solver import POLICY
+
+CACHE_FILE = "self_play_cache.jsonl"
+
+
+def word_list_hash(words):
+    """
+    Hash of the contents of a word list, independent of its order and duplicates.
+    """
+    return hashlib.sha256("\n".join(sorted(set(words))).encode("utf-8")).hexdigest()
+
+
+def game_key(words_hash, opener, solution, policy=POLICY):
+    """
+    Content address of one self-play game: everything its outcome depends on.
+    """
+    return hashlib.sha256(f"{policy}|{words_hash}|{opener}|{solution}".encode("utf-8")).hexdigest()
+
+
+class GameCache:
+    """
+    Outcomes of self-play games by content address, kept in a JSON lines file. New games
+    are appended, so a run that is interrupted still keeps the games it finished.
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.games = {}
+        self._file = None
+        if os.path.exists(path):
+            with open(path, "r") as cache_file:
+                for line in cache_file:
+                    try:
+                        game = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A line cut off by an interrupted run
+                    self.games[game["key"]] = game
+
+    def get(self, key):
+        """
+        Returns the cached game ({"attempts", "guesses"}) or None.
+        """
+        game = self.games.get(key)
+        metrics.cache_event("self_play", game is not None)
+        return game
+
+    def put(self, key, attempts, guesses):
+        game = {"key": key, "attempts": attempts, "guesses": guesses}
+        self.games[key] = game
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps(game) + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,122 @@
+import csv
+import time
+
+import numpy as np
+
+from patterns import PatternIndex, decode_pattern, entropies
+from solver import feedback_error, pick_best, pick_best_index
+from wordlists import load_word_lists
+
+
+def load_dictionary(word_length):
+    """
+    Loads every guessable word of the given length, normalized and without duplicates.
+    """
+    return load_word_lists(word_length).guesses()
+
+
+def global_index(word_length):
+    """
+    The pattern index of the whole dictionary, built on the ingested encoded word list.
+    """
+    word_lists = load_word_lists(word_length)
+    return PatternIndex(word_lists.guesses(), word_lists.encoded("guesses"))
+
+
+def global_table_file(word_length):
+    if word_length == 5:
+        return "five_letter_global_table.csv"
+    return "six_letter_global_table.csv"
+
+
+def score_candidates(index, candidates):
+    """
+    Scores every candidate as a guess against the other candidates with the pattern engine,
+    the vectorized equivalent of `calculate_weighted_avg_log(candidates, candidates)`.
+    Returns the best guess and {guess: score}.
+    """
+    positions = [index.position[word] for word in candidates]
+    scores = entropies(index.matrix(candidates, positions), index.word_length)
+    scores = dict(zip(candidates, scores.tolist()))
+    return pick_best(scores), scores
+
+
+def build_global_table(word_length):
+    """
+    Precomputes the opener of the whole dictionary and, for every feedback on that opener,
+    the best second guess. This is the only step that needs the full dictionary x
+    dictionary pattern matrix; it is scored in blocks and never kept in memory as a whole.
+    """
+    start = time.perf_counter()
+    index = global_index(word_length)
+
+    opener_scores = entropies(index.matrix(index.words), word_length)
+    opener = index.words[pick_best_index(index.words, opener_scores)]
+    rows = [["", opener, opener_scores.max(), len(index)]]
+
+    # Every feedback on the opener leaves its own set of candidates
+    opener_row = index.row(opener)
+    for code in np.unique(opener_row):
+        candidates = [index.words[i] for i in np.flatnonzero(opener_row == code)]
+        second_guess, scores = score_candidates(index, candidates)
+        rows.append([decode_pattern(code, word_length), second_guess, scores[second_guess], len(candidates)])
+
+    output_file = global_table_file(word_length)
+    with open(output_file, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Feedback", "Guess", "Weighted Avg Log", "Candidates"])
+        writer.writerows(rows)
+
+    print(f"Opener {opener.upper()} and {len(rows) - 1} second guesses saved to {output_file} "
+          f"in {time.perf_counter() - start:.1f} s.")
+
+
+def load_global_game(word_length):
+    """
+    Loads the global pattern index and the opener/second-guess table for a game without
+    a given first letter. The table maps "" to the opener and each feedback on the opener
+    to (second guess, score).
+    """
+    index = global_index(word_length)
+    table = {}
+    with open(global_table_file(word_length), "r") as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader)  # Skip the header row
+        for row in reader:
+            table[row[0]] = (row[1], float(row[2]))
+    return index, table
+
+
+def global_next_guess(index, table, history, candidates):
+    """
+    Recommends the next guess of a whole-dictionary game. The second guess comes from the
+    table, later guesses are scored over the remaining candidates.
+    Returns the best guess and {guess: score}.
+    """
+    if not history:
+        guess, score = table[""]
+        return guess, {guess: score}
+    if len(history) == 1 and history[0][0] == table[""][0] and history[0][1] in table:
+        guess, score = table[history[0][1]]
+        return guess, {guess: score}
+    return score_candidates(index, candidates)
+
+
+def candidates_after(index, history):
+    """
+    Returns the words of the index that agree with every (guess, feedback) of the history.
+    Raises ValueError for feedback that is not one 0, 1 or 2 per letter.
+    """
+    for _, feedback in history:
+        error = feedback_error(feedback, index.word_length)
+        if error:
+            raise ValueError(error)
+    mask = np.ones(len(index), dtype=bool)
+    for guess, feedback in history:
+        mask &= index.row(guess) == int(feedback, 3)
+    return [index.words[i] for i in np.flatnonzero(mask)]
+
+
+if __name__ == "__main__":
+    build_global_table(5)
+    build_global_table(6)
@@ -0,0 +1,150 @@
+import argparse
+import csv
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+
+from batch_solve import solve_chunk
+from solver import get_feedback, load_precomputed_logs, opening_guess, solve_state
+from solver_service import SolverClient
+
+
+def current_rss():
+    """
+    Returns the resident memory of this process in bytes (Linux only).
+    """
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def replay_trace(solution, word_length):
+    """
+    Plays one self-play game with the solver core and returns the guesses it made,
+    for results files written before self-play recorded its guesses.
+    """
+    word_logs = load_precomputed_logs(solution[0], word_length)
+    opener = opening_guess(solution[0], word_length, word_logs)
+    history = []
+    guesses = []
+    while True:
+        guess = solve_state(word_logs, history, opener=opener)["guess"]
+        guesses.append(guess)
+        if guess == solution or guess is None or len(guesses) > 20:
+            return guesses
+        history.append((guess, get_feedback(guess, solution)))
+
+
+def load_games(word_lengths, count, seed):
+    """
+    Samples `count` games from the self-play results of `LINGOBEAST VS LINGOBEAST.py`.
+    Each game is the solution and the guesses self-play made to find it.
+    """
+    rows = []
+    for word_length in word_lengths:
+        with open(f"lingo_results_{word_length}_letters.csv", "r") as csvfile:
+            for row in csv.DictReader(csvfile):
+                rows.append((word_length, row))
+
+    games = []
+    for word_length, row in random.Random(seed).sample(rows, min(count, len(rows))):
+        guesses = row["guesses"].split() if row.get("guesses") else replay_trace(row["word"], word_length)
+        games.append({"length": word_length, "first_letter": row["word"][0], "word": row["word"], "guesses": guesses})
+    return games
+
+
+def run_player(target, port, games, alternatives):
+    """
+    Plays the given games one after another like a single player would: one request per
+    turn with the history so far. Returns the latency of every request and the memory
+    of this worker before and after.
+    """
+    rss_start = current_rss()
+    client = SolverClient(port=port) if target == "service" else None
+    latencies = []
+
+    for game in games:
+        history = []
+        for guess in game["guesses"]:
+            start = time.perf_counter()
+            if client:
+                if history:
+                    client.next(game["first_letter"], game["length"], history, alternatives)
+                else:
+                    client.start(game["first_letter"], game["length"])
+            else:
+                solve_chunk(game["length"], game["first_letter"], [history], alternatives)
+            latencies.append(time.perf_counter() - start)
+            history.append((guess, get_feedback(guess, game["word"])))
+
+    if client:
+        client.close()
+    return {"pid": os.getpid(), "requests": len(latencies), "latencies": latencies,
+            "rss_start": rss_start, "rss_end": current_rss()}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def run_load_test(target, games, concurrency, port=8600, alternatives=5):
+    """
+    Replays the games with `concurrency` simultaneous players against the solver core
+    (each player in its own process) or against a running solver service.
+    """
+    players = [games[i::concurrency] for i in range(concurrency)]
+    start = time.perf_counter()
+    with Pool(concurrency) as pool:
+        workers = pool.starmap(run_player, [(target, port, player, alternatives) for player in players])
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for worker in workers for latency in worker["latencies"])
+    return {
+        "target": target,
+        "concurrency": concurrency,
+        "games": len(games),
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "games_per_second": round(len(games) / elapsed, 2),
+        "latency_ms": {name: round(percentile(latencies, fraction) * 1000, 2)
+                       for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))},
+        "workers": [{"pid": worker["pid"], "requests": worker["requests"],
+                     "rss_start_mb": round(worker["rss_start"] / 2**20, 1),
+                     "rss_growth_mb": round((worker["rss_end"] - worker["rss_start"]) / 2**20, 1)}
+                    for worker in workers],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay self-play games against the solver at a given concurrency.")
+    parser.add_argument("--target", choices=["core", "service"], default="core",
+                        help="solver core in worker processes, or a running solver_service.py")
+    parser.add_argument("--port", type=int, default=8600, help="port of the solver service")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="number of simultaneous players")
+    parser.add_argument("-n", "--games", type=int, default=200, help="number of games to replay")
+    parser.add_argument("--length", type=int, choices=[5, 6], action="append", help="word length(s) to sample from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    games = load_games(args.length or [5, 6], args.games, args.seed)
+    report = run_load_test(args.target, games, args.concurrency, args.port)
+
+    print(f"{report['requests']} requests in {report['seconds']} s: {report['requests_per_second']} req/s, "
+          f"{report['games_per_second']} games/s")
+    print("Latency (ms): " + ", ".join(f"{name} {value}" for name, value in report["latency_ms"].items()))
+    for worker in report["workers"]:
+        print(f"Worker {worker['pid']}: {worker['requests']} requests, "
+              f"RSS {worker['rss_start_mb']} MB, growth {worker['rss_growth_mb']} MB")
+
+    if args.output:
+        with open(args.output, "w") as outfile:
+            json.dump(report, outfile, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,11 @@
 import csv
 
-# Read and filter valid five-letter solutions
-six_letter_solutions = []
-with open('possible_six_letter_guesses.txt') as f:
-    lines = [line.strip() for line in f if line.strip()]  # Strip whitespace and skip empty lines
+from wordlists import load_word_lists
 
-for word in lines:
-    six_letter_solutions.append(word)
-
-# Read and filter valid five-letter guesses
-six_letter_guesses = []
-with open('possible_six_letter_guesses.txt') as f:
-    lines = [line.strip() for line in f if line.strip()]
-
-for word in lines:
-    six_letter_guesses.append(word)
+# Valid six-letter solutions and guesses, normalized and without duplicates
+six_letter_lists = load_word_lists(6)
+six_letter_solutions = six_letter_lists.solutions()
+six_letter_guesses = six_letter_lists.guesses()
 
 # Initialize results dictionary
 results = {solution: [] for solution in six_letter_solutions}
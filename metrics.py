@@ -0,0 +1,210 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+# Instrumentation is off unless a sink is configured or a turn is being recorded.
+# Every wrapper first checks `_active`, so the disabled path costs one global lookup.
+_active = 0
+_lock = threading.Lock()
+_local = threading.local()
+
+_jsonl_file = None
+_prometheus_path = None
+
+# Aggregates per instrumented name: call count, total seconds and summed input sizes
+_calls = defaultdict(int)
+_seconds = defaultdict(float)
+_sizes = defaultdict(lambda: defaultdict(int))
+_cache = defaultdict(lambda: {"hit": 0, "miss": 0})
+
+
+def enable(jsonl_path=None, prometheus_path=None):
+    """
+    Turns on metric collection. Events are appended to `jsonl_path` as JSON lines and the
+    aggregated counters are written to `prometheus_path` in Prometheus text format on exit.
+    Without any path the aggregates are only kept in memory (see `snapshot`).
+    """
+    global _active, _jsonl_file, _prometheus_path
+    with _lock:
+        if jsonl_path:
+            if _jsonl_file:
+                _jsonl_file.close()
+            _jsonl_file = open(jsonl_path, "a", encoding="utf-8")
+        if prometheus_path:
+            _prometheus_path = prometheus_path
+        _active += 1
+
+
+def disable():
+    """
+    Turns off metric collection that was switched on with `enable`.
+    """
+    global _active, _jsonl_file
+    with _lock:
+        if _jsonl_file:
+            _jsonl_file.close()
+            _jsonl_file = None
+        _active = max(_active - 1, 0)
+
+
+def record(name, seconds, **fields):
+    """
+    Records one event: updates the aggregates, writes a JSON line to the sink and hands
+    the event to every turn currently being recorded in this thread.
+    """
+    event = {"name": name, "ms": round(seconds * 1000, 3), **fields}
+    with _lock:
+        _calls[name] += 1
+        _seconds[name] += seconds
+        for key, value in fields.items():
+            if isinstance(value, int) and not isinstance(value, bool):
+                _sizes[name][key] += value
+        if _jsonl_file:
+            _jsonl_file.write(json.dumps({"ts": time.time(), **event}) + "\n")
+            _jsonl_file.flush()
+    for events in getattr(_local, "turns", ()):
+        events.append(event)
+
+
+def cache_event(name, hit):
+    """
+    Counts a cache hit or miss for the cache called `name`.
+    """
+    if not _active:
+        return
+    with _lock:
+        _cache[name]["hit" if hit else "miss"] += 1
+        if _jsonl_file:
+            _jsonl_file.write(json.dumps({"ts": time.time(), "name": f"{name}.cache", "hit": hit}) + "\n")
+            _jsonl_file.flush()
+
+
+def instrument(name, sizes=None):
+    """
+    Decorator that times every call of the wrapped function under `name`.
+    `sizes` receives the call arguments and returns a dict of input sizes to record,
+    for example {"candidates": len(possible_words)}.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            fields = sizes(*args, **kwargs) if sizes else {}
+            record(name, time.perf_counter() - start, **fields)
+            return result
+        return wrapper
+    return decorator
+
+
+def candidate_sizes(possible_words, *args, **kwargs):
+    """
+    Input sizes of `filter_words`: the number of candidates being filtered.
+    """
+    return {"candidates": len(possible_words)}
+
+
+def scoring_sizes(remaining_solutions, guesses, *args, **kwargs):
+    """
+    Input sizes of `calculate_weighted_avg_log`: remaining candidates and guesses to score.
+    """
+    return {"candidates": len(remaining_solutions), "guesses": len(guesses)}
+
+
+@contextmanager
+def timer(name, **fields):
+    """
+    Times the body of a `with` block, for example one game of the self-play loop.
+    Extra fields can be added to the yielded dict while the block runs.
+    """
+    if not _active:
+        yield fields
+        return
+    start = time.perf_counter()
+    yield fields
+    record(name, time.perf_counter() - start, **fields)
+
+
+@contextmanager
+def turn():
+    """
+    Collects every event recorded in this thread during the `with` block into the yielded
+    list, so a front-end can show the timings of a single turn.
+    """
+    global _active
+    events = []
+    if not hasattr(_local, "turns"):
+        _local.turns = []
+    _local.turns.append(events)
+    with _lock:
+        _active += 1
+    try:
+        yield events
+    finally:
+        _local.turns.remove(events)
+        with _lock:
+            _active -= 1
+
+
+def snapshot():
+    """
+    Returns the aggregated metrics as a dict: {name: {"calls", "seconds", sizes...}}.
+    """
+    with _lock:
+        result = {}
+        for name in _calls:
+            result[name] = {"calls": _calls[name], "seconds": _seconds[name], **_sizes[name]}
+        for name, counts in _cache.items():
+            result.setdefault(f"{name}.cache", {}).update(counts)
+        return result
+
+
+def prometheus_text():
+    """
+    Renders the aggregated metrics in the Prometheus text exposition format.
+    """
+    with _lock:
+        lines = ["# TYPE lingobeast_calls_total counter"]
+        for name in sorted(_calls):
+            lines.append(f'lingobeast_calls_total{{name="{name}"}} {_calls[name]}')
+        lines.append("# TYPE lingobeast_seconds_total counter")
+        for name in sorted(_calls):
+            lines.append(f'lingobeast_seconds_total{{name="{name}"}} {_seconds[name]:.6f}')
+        lines.append("# TYPE lingobeast_input_size_total counter")
+        for name in sorted(_sizes):
+            for key, value in sorted(_sizes[name].items()):
+                lines.append(f'lingobeast_input_size_total{{name="{name}",input="{key}"}} {value}')
+        lines.append("# TYPE lingobeast_cache_total counter")
+        for name, counts in sorted(_cache.items()):
+            for result, value in counts.items():
+                lines.append(f'lingobeast_cache_total{{name="{name}",result="{result}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def dump_prometheus(path):
+    """
+    Writes the Prometheus text dump to `path`.
+    """
+    with open(path, "w", encoding="utf-8") as outfile:
+        outfile.write(prometheus_text())
+
+
+@atexit.register
+def _flush_at_exit():
+    if _prometheus_path:
+        dump_prometheus(_prometheus_path)
+    if _jsonl_file:
+        _jsonl_file.close()
+
+
+# LINGOBEAST_METRICS=<file.jsonl> and/or LINGOBEAST_METRICS_PROM=<file.prom> switch
+# collection on for any script without code changes.
+if os.environ.get("LINGOBEAST_METRICS") or os.environ.get("LINGOBEAST_METRICS_PROM"):
+    enable(os.environ.get("LINGOBEAST_METRICS"), os.environ.get("LINGOBEAST_METRICS_PROM"))
@@ -0,0 +1,95 @@
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from patterns import entropies, pattern_matrix
+from solver import FIRST_LETTERS, load_precomputed_logs, openers_file, pick_best, rank_best
+from wordlists import bucket_index, load_word_lists
+from worst_case import current_policy, policy_depths
+
+
+def search_bucket(word_length, first_letter, simulate=0):
+    """
+    Scores every guess of the bucket against the bucket's solutions with the pattern engine
+    and picks the opener with the highest weighted average log. With `simulate`, the best
+    that many openers and the best log of the bucket's logs are also played against every
+    word of the bucket, and the one with the lowest maximum number of guesses wins, then the
+    lowest mean. So the worst case never gets worse than with the best log as opener.
+    """
+    start = time.perf_counter()
+    word_lists = load_word_lists(word_length)
+    guesses = word_lists.guesses(first_letter)
+    solutions = word_lists.solutions(first_letter)
+
+    scores = entropies(pattern_matrix(word_lists.encoded("guesses", first_letter),
+                                      word_lists.encoded("solutions", first_letter)), word_length)
+    ranked = rank_best(guesses, scores)
+    best = {"guess": guesses[ranked[0]], "score": scores[ranked[0]], "mean": None, "max": None}
+
+    if simulate:
+        # Self-play plays every word of the precomputed logs as a solution
+        word_logs = load_precomputed_logs(first_letter, word_length)
+        index = bucket_index(word_length, first_letter, word_logs)
+        matrix = index.matrix(index.words)
+        candidates = np.arange(len(index))
+
+        # The best log goes first, so it stays the opener unless another guess beats it
+        score = dict(zip(guesses, scores.tolist()))
+        openers = [pick_best({word: word_logs[word] for word in index.words})] if len(index) else []
+        openers += [guesses[i] for i in ranked[:simulate] if guesses[i] in index.position and guesses[i] not in openers]
+        for guess in openers:
+            opener = index.position[guess]
+            depths = policy_depths(matrix, candidates, current_policy(matrix, word_length, opener, index.words))
+            result = {"guess": guess, "score": score.get(guess, word_logs[guess]),
+                      "mean": sum(depths.values()) / len(depths), "max": max(depths.values())}
+            # The entropy-best guess without a simulation stays the result if nothing was played
+            if best["mean"] is None or (result["max"], result["mean"]) < (best["max"], best["mean"]):
+                best = result
+
+    return {"bucket": first_letter, "guesses": len(guesses), "solutions": len(solutions),
+            "seconds": time.perf_counter() - start, **best}
+
+
+def search_openers(word_length, workers=None, simulate=0):
+    """
+    Runs `search_bucket` for every bucket of a word length in parallel and saves the
+    chosen openers, which the solver then uses instead of the best precomputed log.
+    """
+    prefix = "five" if word_length == 5 else "six"
+    buckets = [letter for letter in FIRST_LETTERS if os.path.exists(f"{prefix}_letter_logs_{letter}.csv")]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        reports = list(executor.map(search_bucket, [word_length] * len(buckets), buckets, [simulate] * len(buckets)))
+
+    output_file = openers_file(word_length)
+    with open(output_file, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Bucket", "Opener", "Weighted Avg Log", "Mean Guesses", "Max Guesses"])
+        for report in reports:
+            writer.writerow([report["bucket"], report["guess"], report["score"],
+                             "" if report["mean"] is None else round(report["mean"], 4), report["max"] or ""])
+
+    for report in reports:
+        summary = f" ({report['mean']:.3f} guesses on average)" if report["mean"] is not None else ""
+        print(f"{word_length}{report['bucket']}: {report['guesses']} guesses against {report['solutions']} solutions, "
+              f"opener {report['guess'].upper()}{summary} in {report['seconds']:.1f} s")
+    print(f"Openers saved to {output_file}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute the best opener of every bucket.")
+    parser.add_argument("--length", type=int, choices=[5, 6], action="append", help="word length(s) to search")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--simulate", type=int, default=0, metavar="K",
+                        help="rank the K best openers by the mean number of guesses in simulated self-play")
+    args = parser.parse_args()
+
+    for word_length in args.length or [5, 6]:
+        search_openers(word_length, args.workers, args.simulate)
+
+
+if __name__ == "__main__":
+    main()
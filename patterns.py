@@ -0,0 +1,217 @@
+import numpy as np
+
+# Guesses are scored in blocks of this many rows to bound the memory of the intermediate arrays
+BLOCK_SIZE = 1024
+
+
+def encode_words(words):
+    """
+    Encodes equally long words as a (words x letters) uint8 matrix of character codes.
+    """
+    words = list(words)
+    if not words:
+        return np.zeros((0, 0), dtype=np.uint8)
+    data = "".join(words).encode("latin-1")
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(words), -1).copy()
+
+
+def encode_feedback(feedback):
+    """
+    Converts a feedback string such as "21020" to its pattern code, the base-3 number
+    with the first position as the most significant digit.
+    """
+    return int(feedback, 3)
+
+
+def decode_pattern(code, word_length):
+    """
+    Converts a pattern code back to its feedback string.
+    """
+    digits = []
+    for _ in range(word_length):
+        code, digit = divmod(int(code), 3)
+        digits.append(str(digit))
+    return "".join(reversed(digits))
+
+
+def pattern_matrix(guesses, solutions):
+    """
+    Computes the feedback of every guess against every solution at once.
+    Takes encoded guesses (G x L) and solutions (S x L) and returns a G x S uint16 matrix of
+    pattern codes. Gives the same feedback as `get_feedback`: a letter that is not green is
+    yellow as long as the solution still has unmatched copies of it, counted from the left.
+    """
+    n_guesses, word_length = guesses.shape
+    codes = np.zeros((n_guesses, solutions.shape[0]), dtype=np.uint16)
+    if n_guesses == 0 or solutions.shape[0] == 0:
+        return codes
+
+    # Positions where every guess and every solution have the same letter are green for all
+    # pairs and use up that letter on both sides, so they are left out of the comparison
+    settled = (solutions == solutions[0]).all(axis=0) & (guesses == solutions[0]).all(axis=0)
+    guesses, solutions = guesses[:, ~settled], solutions[:, ~settled]
+
+    # letter_counts[c, j]: how often character code c occurs in solution j
+    letter_counts = np.zeros((256, solutions.shape[0]), dtype=np.uint8)
+    for k in range(solutions.shape[1]):
+        np.add.at(letter_counts, (solutions[:, k], np.arange(solutions.shape[0])), 1)
+
+    # Letters that no solution contains are gray wherever they are, so they all become 0.
+    # Guesses that only differ in such letters split the solutions the same way and are scored once.
+    present = letter_counts.any(axis=1)
+    present[0] = False
+    unique, inverse = np.unique(np.where(present[guesses], guesses, 0), axis=0, return_inverse=True)
+    unique_codes = np.zeros((unique.shape[0], solutions.shape[0]), dtype=np.uint16)
+
+    # Guesses without a repeated letter take a much cheaper path, so score them separately
+    repeated = np.array([len(set(letters) - {0}) < len(letters) - letters.count(0) for letters in unique.tolist()],
+                        dtype=bool)
+    for is_repeated in (False, True):
+        rows = np.flatnonzero(repeated == is_repeated)
+        for start in range(0, len(rows), BLOCK_SIZE):
+            block = rows[start:start + BLOCK_SIZE]
+            unique_codes[block] = _block_codes(unique[block], solutions, letter_counts, is_repeated, settled)
+
+    codes[:] = unique_codes[inverse.reshape(-1)]
+    return codes
+
+
+def _block_codes(g, solutions, letter_counts, repeated, settled):
+    green = [g[:, k, None] == solutions[None, :, k] for k in range(g.shape[1])]
+    same = g[:, :, None] == g[:, None, :]  # same[:, i, k]: guess letters i and k are equal
+
+    block = np.zeros((g.shape[0], solutions.shape[0]), dtype=np.uint16)
+    i = 0  # Position in the words without the settled positions
+    for is_settled in settled:
+        block *= 3
+        if is_settled:
+            block += 2
+            continue
+        if not repeated:
+            # A letter that occurs once in the guess is yellow whenever the solution has it
+            yellow = ~green[i] & (letter_counts[g[:, i]] > 0)
+        else:
+            # Copies of this letter in the solution that are not used by a green
+            available = letter_counts[g[:, i]]
+            taken = np.zeros_like(available)
+            for k in range(g.shape[1]):
+                if same[:, i, k].any():
+                    available = available - (green[k] & same[:, i, k, None])
+                    # Earlier non-green copies of this letter in the guess already took one each
+                    if k < i:
+                        taken += ~green[k] & same[:, i, k, None]
+            yellow = ~green[i] & (taken < available)
+        block += yellow
+        block += green[i] * np.uint16(2)
+        i += 1
+    return block
+
+
+def pattern_histograms(codes, word_length):
+    """
+    Counts for every row of a pattern code matrix how often each pattern occurs.
+    Returns a (rows x 3**word_length) matrix; row g is the partition guess g makes.
+    """
+    n_patterns = 3 ** word_length
+    counts = np.zeros((codes.shape[0], n_patterns), dtype=np.int32)
+    for start in range(0, codes.shape[0], BLOCK_SIZE):
+        block = codes[start:start + BLOCK_SIZE].astype(np.int64)
+        offsets = np.arange(block.shape[0])[:, None] * n_patterns
+        counts[start:start + BLOCK_SIZE] = np.bincount(
+            (block + offsets).ravel(), minlength=block.shape[0] * n_patterns
+        ).reshape(block.shape[0], n_patterns)
+    return counts
+
+
+def histogram_entropies(histograms):
+    """
+    Weighted average log of the feedback fractions of every row of pattern histograms.
+    """
+    fractions = histograms / histograms.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -np.where(fractions > 0, fractions * np.log2(fractions), 0).sum(axis=1)
+
+
+def score_rows(codes, word_length, score):
+    """
+    Scores every row of a pattern code matrix with `score`, a function from pattern
+    histograms (rows x patterns) to one score per row.
+    """
+    if codes.shape[1] == 0:
+        return np.zeros(codes.shape[0], dtype=np.float64)
+
+    # Rows with the same pattern vector are the same partition, so each is scored once
+    classes, representatives = partition_classes(codes)
+    codes = codes[representatives]
+
+    scores = np.zeros(codes.shape[0], dtype=np.float64)
+    for start in range(0, codes.shape[0], BLOCK_SIZE):
+        scores[start:start + BLOCK_SIZE] = score(pattern_histograms(codes[start:start + BLOCK_SIZE], word_length))
+    return scores[classes]
+
+
+def entropies(codes, word_length):
+    """
+    Computes for every row of a pattern code matrix the weighted average log of the
+    feedback fractions, the same score `calculate_weighted_avg_log` gives each guess.
+    """
+    return score_rows(codes, word_length, histogram_entropies)
+
+
+def partition_classes(codes):
+    """
+    Groups the rows of a pattern code matrix by a fingerprint of their pattern vector.
+    Returns for every row the number of its class and, per class, the first row in it.
+    """
+    fingerprints = {}
+    classes = np.fromiter((fingerprints.setdefault(row.tobytes(), len(fingerprints)) for row in codes),
+                          dtype=np.intp, count=codes.shape[0])
+    _, representatives = np.unique(classes, return_index=True)
+    return classes, representatives
+
+
+def count_position_mismatches(codes, code, word_length):
+    """
+    Counts per pattern code in `codes` how many positions differ from the pattern `code`.
+    """
+    mismatches = np.zeros(codes.shape, dtype=np.int64)
+    codes = codes.astype(np.int64)
+    code = int(code)
+    for _ in range(word_length):
+        mismatches += (codes % 3) != (code % 3)
+        codes //= 3
+        code //= 3
+    return mismatches
+
+
+class PatternIndex:
+    """
+    The words of a bucket in encoded form, with the feedback patterns of guesses against
+    all of them. Rows are cached per guess, so replaying a history only scores new guesses.
+    """
+
+    def __init__(self, words, encoded=None):
+        self.words = list(words)
+        self.position = {word: i for i, word in enumerate(self.words)}
+        # Word lists from `wordlists` come encoded already
+        self.encoded = encode_words(self.words) if encoded is None else encoded
+        self.word_length = self.encoded.shape[1]
+        self._rows = {}
+
+    def __len__(self):
+        return len(self.words)
+
+    def row(self, guess):
+        """
+        Pattern codes of `guess` against every word of the index.
+        """
+        if guess not in self._rows:
+            self._rows[guess] = pattern_matrix(encode_words([guess]), self.encoded)[0]
+        return self._rows[guess]
+
+    def matrix(self, guesses, solutions=None):
+        """
+        Pattern codes of `guesses` against the given word indices (default: all words).
+        """
+        encoded = self.encoded if solutions is None else self.encoded[solutions]
+        return pattern_matrix(encode_words(guesses), encoded)
@@ -0,0 +1,71 @@
+import numpy as np
+
+# Scores that agree to this many decimals are a tie, and ties go to the alphabetically first
+# word, so the choice does not depend on the order of the word lists
+TIE_DECIMALS = 9
+
+
+class Ranking:
+    """
+    Scores of a set of words, kept in arrays so the best words can be served without
+    sorting everything. Top-k lists and the full rank order are cached until the scores
+    are replaced, so asking again (for example on every Streamlit rerun) costs nothing.
+    Words rank by their score rounded to TIE_DECIMALS and ties alphabetically, like
+    `solver.pick_best`.
+    """
+
+    def __init__(self, scores=None):
+        self.set_scores(scores or {})
+
+    def set_scores(self, scores):
+        """
+        Replaces the scores ({word: score}) and invalidates the cached rankings.
+        """
+        self.words = list(scores)
+        self.scores = np.fromiter(scores.values(), dtype=np.float64, count=len(self.words))
+        # Negated rounded scores, the first sort key; rounded like `round` in pick_best
+        self._keys = -np.array([round(score, TIE_DECIMALS) for score in self.scores.tolist()], dtype=np.float64)
+        self._order = None
+        self._top = {}
+
+    def __len__(self):
+        return len(self.words)
+
+    def top(self, k, exclude=()):
+        """
+        Returns the `k` highest scoring (word, score) pairs, best first, skipping the words
+        in `exclude`, in the same order as `ranked`. Only the first k + len(exclude) words
+        (and the words tied with the last of them) are selected and sorted.
+        """
+        key = (k, tuple(exclude))
+        if key not in self._top:
+            n = min(k + len(exclude), len(self.words))
+            if n == 0:
+                indices = []
+            elif self._order is not None:
+                indices = self._order[:n]
+            else:
+                # Partial selection of the n best plus every word tied with the n-th, then
+                # sort only those by rounded score and word, the order of `ranked`
+                threshold = np.partition(self._keys, n - 1)[n - 1]
+                indices = np.flatnonzero(self._keys <= threshold)
+                indices = sorted(indices, key=lambda i: (self._keys[i], self.words[i]))[:n]
+            self._top[key] = [
+                (self.words[i], float(self.scores[i])) for i in indices if self.words[i] not in exclude
+            ][:k]
+        return self._top[key]
+
+    def best(self):
+        """
+        Returns the highest scoring word, or None when there are no scores.
+        """
+        top = self.top(1)
+        return top[0][0] if top else None
+
+    def ranked(self):
+        """
+        Returns every (word, score) pair from highest to lowest score.
+        """
+        if self._order is None:
+            self._order = np.lexsort((np.array(self.words, dtype=str), self._keys))
+        return [(self.words[i], float(self.scores[i])) for i in self._order]
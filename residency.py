@@ -0,0 +1,222 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+from patterns import entropies
+from solver import load_precomputed_logs, opening_guess, pick_best
+from strategies import strategy_scores
+from wordlists import bucket_index
+
+# Memory the resident buckets may use, in MB; the least recently used buckets are evicted beyond it
+DEFAULT_BUDGET_MB = 256
+
+# Directory of the memory-mapped bucket tables, one subdirectory per bucket content
+CACHE_DIR = "bucket_cache"
+
+# Rough memory of one word in the word list and position dict of a bucket
+WORD_OVERHEAD_BYTES = 200
+
+# Candidate sets per bucket whose recommended guess is kept for other sessions
+NEXT_GUESS_CACHE_SIZE = 256
+
+
+class Bucket:
+    """
+    One bucket in compact form: the words, their log scores as an array, the pattern matrix
+    of every word against every other and, for every word, its score as a second guess
+    among the words that give the same feedback on the opener. The matrix and second-guess
+    scores are memory-mapped from the cache directory, so reloading a bucket is cheap.
+    """
+
+    def __init__(self, word_length, first_letter, cache_dir=CACHE_DIR):
+        word_logs = load_precomputed_logs(first_letter, word_length)
+        self.word_length = word_length
+        self.first_letter = first_letter
+        self.index = bucket_index(word_length, first_letter, word_logs)
+        self.scores = np.array([word_logs[word] for word in self.index.words], dtype=np.float64)
+        self.opener = opening_guess(first_letter, word_length, word_logs)
+        self.matrix, self.second_scores = self._load_tables(cache_dir)
+        self._next_guesses = OrderedDict()  # CandidateSet -> (best guess, scores), least recently used first
+        self._lock = threading.Lock()
+
+    def _load_tables(self, cache_dir):
+        # The tables only depend on the words (in order) and the opener
+        digest = hashlib.sha256(("\n".join(self.index.words) + "\n" + self.opener).encode("utf-8")).hexdigest()
+        directory = os.path.join(cache_dir, f"{self.word_length}{self.first_letter}-{digest[:16]}")
+
+        if not os.path.isdir(directory):
+            matrix = self.index.matrix(self.index.words)
+            second_scores = np.zeros(len(self.index), dtype=np.float64)
+            opener_row = matrix[self.index.position[self.opener]]
+            for code in np.unique(opener_row):
+                group = np.flatnonzero(opener_row == code)
+                second_scores[group] = entropies(matrix[np.ix_(group, group)], self.word_length)
+
+            # Write to a temporary directory first, so a reader never sees half a bucket
+            os.makedirs(cache_dir, exist_ok=True)
+            partial = tempfile.mkdtemp(dir=cache_dir)
+            np.save(os.path.join(partial, "matrix.npy"), matrix)
+            np.save(os.path.join(partial, "second_scores.npy"), second_scores)
+            try:
+                os.rename(partial, directory)
+            except OSError:
+                shutil.rmtree(partial)  # Another process wrote the same bucket first
+
+        return (np.load(os.path.join(directory, "matrix.npy"), mmap_mode="r"),
+                np.load(os.path.join(directory, "second_scores.npy"), mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def word_logs(self):
+        """
+        The precomputed logs as {word: log_score}, built from the arrays on every call.
+        """
+        return dict(zip(self.index.words, self.scores.tolist()))
+
+    @property
+    def nbytes(self):
+        return (self.matrix.nbytes + self.second_scores.nbytes + self.scores.nbytes + self.index.encoded.nbytes
+                + len(self.index) * WORD_OVERHEAD_BYTES)
+
+    @property
+    def words(self):
+        return self.index.words
+
+    @property
+    def position(self):
+        return self.index.position
+
+    def row(self, guess):
+        """
+        Pattern codes of `guess` against every word, read from the pattern matrix.
+        """
+        if guess in self.index.position:
+            return self.matrix[self.index.position[guess]]
+        return self.index.row(guess)
+
+    def best_guess(self, positions, after_opener=False, strategy="entropy"):
+        """
+        Scores the words at `positions` against each other with a strategy from `strategies`,
+        from the precomputed second-guess scores when they are what remains after the opener.
+        Returns the best guess and {guess: score}.
+        """
+        words = [self.index.words[i] for i in positions]
+        if after_opener and strategy == "entropy":
+            values = self.second_scores[positions]
+        else:
+            values = strategy_scores(self.matrix[np.ix_(positions, positions)], self.word_length, strategy)
+        scores = dict(zip(words, values.tolist()))
+        return pick_best(scores), scores
+
+    @metrics.instrument("bucket.next_guess", sizes=lambda self, history, candidates: {"candidates": len(candidates)})
+    def next_guess(self, history, candidates):
+        """
+        Recommends the next guess for a CandidateSet over this bucket. Scores of the second
+        guess after the opener are precomputed. Results are shared by every session that
+        reaches the same candidates. Returns the best guess and {guess: score}.
+        """
+        with self._lock:
+            result = self._next_guesses.get(candidates)
+            if result is not None:
+                self._next_guesses.move_to_end(candidates)
+        metrics.cache_event("next_guess", result is not None)
+        if result is not None:
+            return result
+
+        result = self.best_guess(candidates.indices(), len(history) == 1 and history[0][0] == self.opener)
+        with self._lock:
+            self._next_guesses[candidates] = result
+            if len(self._next_guesses) > NEXT_GUESS_CACHE_SIZE:
+                self._next_guesses.popitem(last=False)
+        return result
+
+
+def estimate_bytes(word_count, word_length):
+    """
+    Resident size of a bucket with `word_count` words, before loading it.
+    """
+    return word_count * word_count * 2 + word_count * (word_length + 16 + WORD_OVERHEAD_BYTES)
+
+
+class ResidencyManager:
+    """
+    Keeps the most recently used buckets resident within a byte budget and evicts the least
+    recently used ones beyond it. An evicted bucket is reloaded from its memory-mapped tables.
+    """
+
+    def __init__(self, budget_bytes, cache_dir=CACHE_DIR):
+        self.budget_bytes = budget_bytes
+        self.cache_dir = cache_dir
+        self.loads = 0
+        self.evictions = 0
+        self._resident = OrderedDict()  # (word_length, first_letter) -> Bucket, least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, word_length, first_letter):
+        """
+        Returns the bucket, loading it when it is not resident.
+        Raises FileNotFoundError when the bucket has no logs.
+        """
+        key = (word_length, first_letter)
+        with self._lock:
+            bucket = self._resident.get(key)
+            if bucket is not None:
+                self._resident.move_to_end(key)
+        metrics.cache_event("bucket", bucket is not None)
+        if bucket is not None:
+            return bucket
+
+        bucket = Bucket(word_length, first_letter, self.cache_dir)
+        with self._lock:
+            if key in self._resident:
+                # Loaded by another thread in the meantime
+                self._resident.move_to_end(key)
+                return self._resident[key]
+            self._resident[key] = bucket
+            self.loads += 1
+            # Never evict the bucket that is being handed out
+            while self.resident_bytes() > self.budget_bytes and len(self._resident) > 1:
+                self._resident.popitem(last=False)
+                self.evictions += 1
+        return bucket
+
+    def is_resident(self, word_length, first_letter):
+        return (word_length, first_letter) in self._resident
+
+    def resident_bytes(self):
+        return sum(bucket.nbytes for bucket in self._resident.values())
+
+    def report(self):
+        """
+        Resident bytes per bucket ("5s", "6b", ...) and in total, with the budget.
+        """
+        with self._lock:
+            buckets = {f"{word_length}{first_letter}": bucket.nbytes
+                       for (word_length, first_letter), bucket in self._resident.items()}
+        return {"budget_bytes": self.budget_bytes, "resident_bytes": sum(buckets.values()), "buckets": buckets,
+                "loads": self.loads, "evictions": self.evictions}
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def manager():
+    """
+    The residency manager of this process. The budget comes from LINGOBEAST_RESIDENT_MB and
+    the cache directory from LINGOBEAST_BUCKET_CACHE.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            budget_mb = float(os.environ.get("LINGOBEAST_RESIDENT_MB", DEFAULT_BUDGET_MB))
+            _manager = ResidencyManager(int(budget_mb * 2**20), os.environ.get("LINGOBEAST_BUCKET_CACHE", CACHE_DIR))
+    return _manager
@@ -0,0 +1,164 @@
+import argparse
+import csv
+import glob
+import os
+from collections import Counter
+
+import numpy as np
+
+from patterns import decode_pattern, encode_feedback, entropies
+
+
+def store_file(results_file):
+    """
+    The columnar store that belongs to a results CSV, e.g. five_letter_results_s.npz.
+    """
+    return os.path.splitext(results_file)[0] + ".npz"
+
+
+def read_results_csv(results_file):
+    """
+    Parses a wide results CSV (one row per guess, one column per solution).
+    Returns the guesses, the solutions and the guesses x solutions matrix of pattern codes.
+    """
+    guesses = []
+    rows = []
+    with open(results_file, "r") as csvfile:
+        reader = csv.reader(csvfile)
+        solutions = next(reader)[1:]  # Header: solutions as columns
+        for row in reader:
+            guesses.append(row[0])
+            rows.append([encode_feedback(feedback) for feedback in row[1:]])
+    codes = np.array(rows, dtype=np.uint16).reshape(len(guesses), len(solutions))
+    return guesses, solutions, codes
+
+
+class ResultsStore:
+    """
+    The feedback of every guess against every solution of a results file, kept as one
+    uint16 matrix of pattern codes. Guesses and solutions are looked up by word, so a row
+    or column is a single slice instead of a pass over the whole CSV.
+    """
+
+    def __init__(self, guesses, solutions, codes):
+        self.guesses = list(guesses)
+        self.solutions = list(solutions)
+        self.codes = codes
+        # A guess that occurs more than once in the word list is looked up by its first row
+        self.guess_position = {}
+        for i, guess in enumerate(self.guesses):
+            self.guess_position.setdefault(guess, i)
+        self.solution_position = {solution: j for j, solution in enumerate(self.solutions)}
+        self.word_length = len(self.solutions[0]) if self.solutions else 0
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["guesses"].tolist(), data["solutions"].tolist(), data["codes"])
+
+    def save(self, path):
+        np.savez(path, guesses=np.array(self.guesses), solutions=np.array(self.solutions), codes=self.codes)
+
+    @classmethod
+    def from_results(cls, results_file):
+        """
+        Opens the store of a results CSV, converting the CSV first when the store is
+        missing or older than the CSV.
+        """
+        path = store_file(results_file)
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(results_file):
+            return cls.load(path)
+        store = cls(*read_results_csv(results_file))
+        store.save(path)
+        return store
+
+    def row(self, guess):
+        """
+        Pattern codes of `guess` against every solution.
+        """
+        return self.codes[self.guess_position[guess]]
+
+    def column(self, solution):
+        """
+        Pattern codes of every guess against `solution`.
+        """
+        return self.codes[:, self.solution_position[solution]]
+
+    def guess_patterns(self, guess):
+        """
+        Returns {solution: feedback} for a guess.
+        """
+        return {solution: decode_pattern(code, self.word_length) for solution, code in zip(self.solutions, self.row(guess))}
+
+    def solution_patterns(self, solution):
+        """
+        Returns {guess: feedback} for a solution.
+        """
+        return {guess: decode_pattern(code, self.word_length) for guess, code in zip(self.guesses, self.column(solution))}
+
+    def histogram(self, guess):
+        """
+        Counts how many solutions give each feedback on a guess.
+        """
+        codes, counts = np.unique(self.row(guess), return_counts=True)
+        return Counter({decode_pattern(code, self.word_length): int(count) for code, count in zip(codes, counts)})
+
+    def isolating_guesses(self, solution):
+        """
+        Returns the guesses whose feedback on `solution` is given by no other solution,
+        so that `solution` is known after guessing them.
+        """
+        column = self.column(solution)
+        matches = (self.codes == column[:, None]).sum(axis=1)
+        return list(dict.fromkeys(self.guesses[i] for i in np.flatnonzero(matches == 1)))
+
+    def weighted_avg_logs(self):
+        """
+        Returns {guess: weighted average log} over all solutions, the scores of the log files.
+        """
+        scores = entropies(self.codes, self.word_length)
+        return {guess: float(scores[i]) for guess, i in self.guess_position.items()}
+
+
+def find_results_file(word, word_length):
+    """
+    The bucket results CSV for a word, e.g. five_letter_results_s.csv for "sprak".
+    """
+    return f"{'five' if word_length == 5 else 'six'}_letter_results_{word[0].lower()}.csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert results CSVs to columnar stores and query them.")
+    parser.add_argument("--convert", action="store_true", help="convert every *_letter_results_*.csv")
+    query = parser.add_mutually_exclusive_group()
+    query.add_argument("--guess", help="feedback of a guess against every solution")
+    query.add_argument("--solution", help="feedback of every guess against a solution")
+    query.add_argument("--isolate", metavar="SOLUTION", help="guesses that leave only this solution")
+    query.add_argument("--histogram", metavar="GUESS", help="pattern histogram of a guess")
+    args = parser.parse_args()
+
+    if args.convert:
+        for results_file in sorted(glob.glob("*_letter_results_*.csv")):
+            store = ResultsStore.from_results(results_file)
+            print(f"{results_file}: {len(store.guesses)} guesses x {len(store.solutions)} solutions "
+                  f"-> {store_file(results_file)}")
+
+    word = args.guess or args.solution or args.isolate or args.histogram
+    if not word:
+        return
+    store = ResultsStore.from_results(find_results_file(word, len(word)))
+    if args.guess:
+        for solution, feedback in store.guess_patterns(word).items():
+            print(f"{solution}: {feedback}")
+    elif args.solution:
+        for guess, feedback in store.solution_patterns(word).items():
+            print(f"{guess}: {feedback}")
+    elif args.isolate:
+        print(" ".join(store.isolating_guesses(word)))
+    else:
+        for feedback, count in store.histogram(word).most_common():
+            print(f"{feedback}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import csv
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import residency
+from solver import FIRST_LETTERS
+from strategies import STRATEGIES
+from worst_case import split
+
+
+def play_bucket(bucket, strategy="entropy"):
+    """
+    Plays every word of a residency Bucket as the solution at once. The games are walked
+    breadth-first through the decision tree of the solver with the given strategy: games
+    that reach the same candidates share one state, whose guess is chosen once for all of them.
+    Returns {solution: (guesses, seconds)}, where `seconds` is the time spent choosing
+    the guesses on the way to that solution.
+    """
+    games = {}
+    level = [(np.arange(len(bucket)), [], 0.0)]  # (candidate positions, guesses so far, seconds)
+    while level:
+        next_level = []
+        for positions, guesses, seconds in level:
+            start = time.perf_counter()
+            if guesses:
+                guess, _ = bucket.best_guess(positions, after_opener=len(guesses) == 1, strategy=strategy)
+            else:
+                guess = bucket.opener
+            seconds += time.perf_counter() - start
+
+            guess_position = bucket.position[guess]
+            path = guesses + [guess]
+            for _, group in split(bucket.matrix[guess_position, positions], positions):
+                if guess_position in group:
+                    # Only the guess itself gives all green
+                    games[guess] = (path, seconds)
+                    group = group[group != guess_position]
+                    if not len(group):
+                        continue
+                next_level.append((group, path, seconds))
+        level = next_level
+    return games
+
+
+def benchmark_bucket(word_length, first_letter, strategy):
+    """
+    Self-plays a bucket with one strategy. Returns the attempt histogram, the number of
+    turns and of distinct states a guess was chosen in, and the CPU time it took.
+    """
+    bucket = residency.manager().get(word_length, first_letter)
+    start = time.process_time()
+    games = play_bucket(bucket, strategy)
+    cpu = time.process_time() - start
+
+    # Every prefix of a game's guesses is a state in which the next guess was chosen
+    states = {tuple(guesses[:i]) for guesses, _ in games.values() for i in range(1, len(guesses))}
+    return {
+        "strategy": strategy,
+        "histogram": Counter(len(guesses) for guesses, _ in games.values()),
+        "turns": sum(len(guesses) for guesses, _ in games.values()),
+        "decisions": len(states),
+        "cpu": cpu,
+    }
+
+
+def compare_strategies(word_length, strategies, workers=None):
+    """
+    Self-plays every bucket of a word length with each strategy, in parallel, and writes the
+    attempt distribution and CPU time per turn of every strategy to CSV.
+    """
+    buckets = [letter for letter in FIRST_LETTERS if os.path.exists(
+        f"{'five' if word_length == 5 else 'six'}_letter_logs_{letter}.csv")]
+    tasks = [(strategy, letter) for strategy in strategies for letter in buckets]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        reports = list(executor.map(benchmark_bucket, [word_length] * len(tasks),
+                                    [letter for _, letter in tasks], [strategy for strategy, _ in tasks]))
+
+    totals = {strategy: {"histogram": Counter(), "turns": 0, "decisions": 0, "cpu": 0.0} for strategy in strategies}
+    for report in reports:
+        total = totals[report["strategy"]]
+        total["histogram"].update(report["histogram"])
+        for field in ("turns", "decisions", "cpu"):
+            total[field] += report[field]
+
+    output_file = f"strategy_benchmark_{word_length}_letters.csv"
+    with open(output_file, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Strategy", "Games", "Mean", "Max", "Decisions", "CPU ms per Decision", "CPU ms per Turn"])
+        for strategy, total in totals.items():
+            games = sum(total["histogram"].values())
+            writer.writerow([strategy, games, round(total["turns"] / games, 4), max(total["histogram"]),
+                             total["decisions"], round(total["cpu"] * 1000 / max(total["decisions"], 1), 3),
+                             round(total["cpu"] * 1000 / total["turns"], 3)])
+
+    histogram_file = f"strategy_histogram_{word_length}_letters.csv"
+    with open(histogram_file, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Strategy", "Number of Guesses", "Frequency"])
+        for strategy, total in totals.items():
+            for attempts, frequency in sorted(total["histogram"].items()):
+                writer.writerow([strategy, attempts, frequency])
+
+    for strategy, total in totals.items():
+        games = sum(total["histogram"].values())
+        print(f"{word_length} letters, {strategy}: mean {total['turns'] / games:.4f}, "
+              f"max {max(total['histogram'])}, {total['cpu'] * 1000 / total['turns']:.3f} ms CPU per turn")
+    print(f"Benchmark saved to {output_file}, attempt histograms to {histogram_file}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare guess strategies by self-playing every bucket.")
+    parser.add_argument("--length", type=int, choices=[5, 6], action="append", help="word length(s) to play")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), action="append",
+                        help="strategies to compare, all by default")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    args = parser.parse_args()
+
+    for word_length in args.length or [5, 6]:
+        compare_strategies(word_length, args.strategy or list(STRATEGIES), args.workers)
+
+
+if __name__ == "__main__":
+    main()
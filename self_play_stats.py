@@ -0,0 +1,111 @@
+import csv
+import heapq
+import json
+import os
+import time
+from collections import Counter
+
+# The summary file is rewritten at most this often while self-play runs
+PUBLISH_INTERVAL = 1.0
+
+# Number of slowest and hardest words kept in the summary
+TOP_WORDS = 10
+
+
+def summary_file(word_length):
+    return f"self_play_summary_{word_length}_letters.json"
+
+
+def frequencies_file(word_length):
+    return f"guess_frequencies_{word_length}_letters.csv"
+
+
+def write_frequencies(word_length, histogram):
+    """
+    Saves an attempt histogram ({attempts: frequency}) as the guess frequencies CSV.
+    """
+    output_file = frequencies_file(word_length)
+    with open(output_file, "w", newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Number of Guesses", "Frequency"])
+        for attempts, frequency in sorted(histogram.items()):
+            writer.writerow([attempts, frequency])
+    return output_file
+
+
+class SelfPlayStats:
+    """
+    Running aggregates of a self-play run: the attempt histogram, the mean and max number
+    of attempts per bucket, the slowest games and the words that needed the most attempts.
+    The summary file is republished while the run goes on, so it can be watched and the
+    run stopped early.
+    """
+
+    def __init__(self, word_length, total=None):
+        self.word_length = word_length
+        self.total = total
+        self.path = summary_file(word_length)
+        self.histogram = Counter()
+        self.buckets = {}  # bucket -> [games, summed attempts, max attempts]
+        self.slowest = []  # Min-heaps of the TOP_WORDS largest (seconds, word) and (attempts, word)
+        self.hardest = []
+        self.games = 0
+        self.started = time.time()
+        self._published = 0.0
+
+    def add(self, bucket, word, attempts, seconds=None):
+        """
+        Adds one game; `seconds` is None for a game taken from the cache.
+        """
+        self.games += 1
+        self.histogram[attempts] += 1
+        stats = self.buckets.setdefault(bucket, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += attempts
+        stats[2] = max(stats[2], attempts)
+
+        if seconds is not None:
+            heapq.heappush(self.slowest, (seconds, word))
+            if len(self.slowest) > TOP_WORDS:
+                heapq.heappop(self.slowest)
+        heapq.heappush(self.hardest, (attempts, word))
+        if len(self.hardest) > TOP_WORDS:
+            heapq.heappop(self.hardest)
+
+        if time.time() - self._published >= PUBLISH_INTERVAL:
+            self.publish()
+
+    def summary(self, finished=False):
+        elapsed = time.time() - self.started
+        attempts = sum(count * frequency for count, frequency in self.histogram.items())
+        return {
+            "word_length": self.word_length,
+            "finished": finished,
+            "games": self.games,
+            "total": self.total,
+            "seconds": round(elapsed, 2),
+            "games_per_second": round(self.games / elapsed, 1) if elapsed else 0.0,
+            "mean_attempts": round(attempts / self.games, 4) if self.games else None,
+            "histogram": {str(count): frequency for count, frequency in sorted(self.histogram.items())},
+            "buckets": {bucket: {"games": games, "mean": round(total / games, 4), "max": most}
+                        for bucket, (games, total, most) in self.buckets.items()},
+            "slowest": [{"word": word, "ms": round(seconds * 1000, 1)} for seconds, word in sorted(self.slowest, reverse=True)],
+            "hardest": [{"word": word, "attempts": count} for count, word in sorted(self.hardest, reverse=True)],
+        }
+
+    def publish(self, finished=False):
+        """
+        Rewrites the summary file; readers never see a half-written file.
+        """
+        partial = self.path + ".tmp"
+        with open(partial, "w") as outfile:
+            json.dump(self.summary(finished), outfile, indent=2)
+        os.replace(partial, self.path)
+        self._published = time.time()
+
+    def finish(self):
+        """
+        Publishes the final summary and saves the guess frequencies.
+        """
+        self.publish(finished=True)
+        return write_frequencies(self.word_length, self.histogram)
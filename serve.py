@@ -0,0 +1,27 @@
+import argparse
+import sys
+
+from streamlit.web import cli
+
+import warmup
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Start the warm-up, then the Streamlit app in the same process. "
+                    "Other options are passed on to `streamlit run`.")
+    parser.add_argument("--ready-port", type=int, default=8502,
+                        help="port of the readiness check (503 while warming up, 200 when ready)")
+    parser.add_argument("--budget-mb", type=float, help="memory budget of the warm-up in MB")
+    args, streamlit_args = parser.parse_known_args()
+
+    warmup.start(budget_mb=args.budget_mb)
+    warmup.serve_readiness(args.ready_port)
+
+    # The app imports the same warmup module, so sessions find the warmed-up buckets
+    sys.argv = ["streamlit", "run", "LINGOBEAST WEB.py", *streamlit_args]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import csv
+import math
+from collections import Counter
+
+import numpy as np
+
+import metrics
+from patterns import PatternIndex, count_position_mismatches, decode_pattern, encode_feedback
+from ranking import TIE_DECIMALS, Ranking
+
+# Every bucket is identified by word length and first letter, "1" stands for IJ
+FIRST_LETTERS = "abcdefghijklmnopqrstuvwxyz1"
+
+# Identifies the guess policy in cached self-play outcomes; change it when the policy changes
+POLICY = f"max-weighted-avg-log/ties-round{TIE_DECIMALS}-alphabetical"
+
+
+@metrics.instrument("load_precomputed_logs")
+def load_precomputed_logs(first_letter, word_length):
+    """
+    Loads the precomputed log scores for the words starting with the given letter and length.
+    """
+    if word_length == 5:
+        log_file = f"five_letter_logs_{first_letter}.csv"
+    else:
+        log_file = f"six_letter_logs_{first_letter}.csv"
+    word_logs = {}
+
+    # Read precomputed logs
+    with open(log_file, "r", encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader)  # Skip the header row
+
+        for row in reader:
+            word_logs[row[0]] = float(row[1])  # {word: log_score}
+
+    return word_logs
+
+
+def pick_best(scores):
+    """
+    Returns the word with the highest score ({word: score}), breaking ties alphabetically.
+    """
+    return min(scores, key=lambda word: (-round(scores[word], TIE_DECIMALS), word))
+
+
+def rank_best(words, scores):
+    """
+    Orders the positions of `words` by their scores (an array), best first, with the
+    tie-break of `pick_best`.
+    """
+    scores = np.asarray(scores, dtype=np.float64).tolist()
+    return sorted(range(len(words)), key=lambda i: (-round(scores[i], TIE_DECIMALS), words[i]))
+
+
+def pick_best_index(words, scores):
+    """
+    The position of the word `pick_best` would choose, for scores given as an array.
+    """
+    scores = np.asarray(scores, dtype=np.float64).tolist()
+    return min(range(len(words)), key=lambda i: (-round(scores[i], TIE_DECIMALS), words[i]))
+
+
+def openers_file(word_length):
+    if word_length == 5:
+        return "five_letter_openers.csv"
+    return "six_letter_openers.csv"
+
+
+# Openers chosen by opener_search.py, loaded once per word length
+_openers = {}
+
+
+def opening_guess(first_letter, word_length, word_logs):
+    """
+    Returns the first guess of a bucket: the opener chosen by opener_search.py when it
+    exists, otherwise the word with the highest precomputed log score.
+    """
+    if word_length not in _openers:
+        _openers[word_length] = {}
+        try:
+            with open(openers_file(word_length), "r") as csvfile:
+                for row in csv.DictReader(csvfile):
+                    _openers[word_length][row["Bucket"]] = row["Opener"]
+        except FileNotFoundError:
+            pass
+
+    opener = _openers[word_length].get(first_letter)
+    if opener in word_logs:
+        return opener
+    return pick_best(word_logs)
+
+
+def get_feedback(guess, solution):
+    """
+    Generates feedback for a guess based on the solution.
+    Feedback is a string of 0, 1, 2 indicating correctness of each position.
+    """
+    solution_list = list(solution)
+    guess_list = list(guess)
+    feedback = ["0"] * len(guess)
+
+    # First pass: Check exact matches (2)
+    for i in range(len(guess)):
+        if guess_list[i] == solution_list[i]:
+            feedback[i] = "2"
+            solution_list[i] = None  # Mark as used
+
+    # Second pass: Check partial matches (1)
+    for i in range(len(guess)):
+        if feedback[i] == "0" and guess_list[i] in solution_list:
+            feedback[i] = "1"
+            solution_list[solution_list.index(guess_list[i])] = None  # Mark as used
+
+    return "".join(feedback)
+
+
+@metrics.instrument("filter_words", sizes=metrics.candidate_sizes)
+def filter_words(possible_words, guess, feedback):
+    """
+    Filters the list of possible words based on feedback from the last guess.
+    Feedback is a string of 0, 1, 2 indicating correctness of each position.
+    """
+    return [word for word in possible_words if get_feedback(guess, word) == feedback]
+
+
+def partition_key(guess, letters, settled):
+    """
+    Canonical form of a guess for a set of remaining solutions. Letters that no solution
+    contains become "." and positions where the guess has the letter that every solution
+    has there become "=". Guesses with the same key split the solutions the same way.
+    """
+    return "".join("=" if settled.get(i) == letter else letter if letter in letters else "."
+                   for i, letter in enumerate(guess))
+
+
+@metrics.instrument("calculate_weighted_avg_log", sizes=metrics.scoring_sizes)
+def calculate_weighted_avg_log(remaining_solutions, guesses):
+    """
+    Recalculates the log scores for each guess based on the remaining possible solutions.
+    Guesses with the same partition key are evaluated once, without their settled positions.
+    """
+    letters = set("".join(remaining_solutions))
+    settled = {i: column[0] for i, column in enumerate(zip(*remaining_solutions)) if len(set(column)) == 1}
+    keys = {guess: partition_key(guess, letters, settled) for guess in guesses}
+
+    # Settled positions are green for every solution and use up that letter, so they are
+    # left out of both the guess and the solutions
+    class_analysis = {}
+    reduced_solutions = {}
+    for key in dict.fromkeys(keys.values()):
+        kept = tuple(i for i, letter in enumerate(key) if letter != "=")
+        if kept not in reduced_solutions:
+            reduced_solutions[kept] = ["".join(solution[i] for i in kept) for solution in remaining_solutions]
+        reduced_guess = key.replace("=", "")
+        class_analysis[key] = Counter(get_feedback(reduced_guess, solution) for solution in reduced_solutions[kept])
+
+    # Compute weighted averages
+    class_weighted_logs = {}
+    for key, counts in class_analysis.items():
+        total = sum(counts.values())
+        fractions = {result: count / total for result, count in counts.items()}
+        logs = {result: math.log2(1 / fraction) for result, fraction in fractions.items()}
+
+        # Weighted average of logs
+        weighted_avg_log = sum(fraction * logs[result] for result, fraction in fractions.items())
+        class_weighted_logs[key] = weighted_avg_log
+    guess_weighted_logs = {guess: class_weighted_logs[key] for guess, key in keys.items()}
+
+    # Return the best guess based on the highest weighted average log
+    best_guess = pick_best(guess_weighted_logs)
+    return best_guess, guess_weighted_logs
+
+
+def feedback_error(feedback, word_length):
+    """
+    Checks that a feedback string has one 0, 1 or 2 per letter.
+    Returns a message for the player, or None when the feedback is valid.
+    """
+    if len(feedback) != word_length or not set(feedback) <= set("012"):
+        return f"Ongeldige feedback '{feedback}': voer {word_length} cijfers in, elk 0, 1 of 2."
+    return None
+
+
+@metrics.instrument("suggest_correction")
+def suggest_correction(index, history):
+    """
+    Finds the most likely typo when the feedback history leaves no possible words.
+    Every word of the bucket (a PatternIndex) is scored by the number of feedback positions
+    it contradicts over the whole history; among the words with the fewest, the corrected
+    history shared by the most words is the most likely one.
+    Returns a dict with the corrected history, the number of changed positions and the
+    words that are possible after the correction, or None for an empty history or one
+    with invalid feedback (see `feedback_error`).
+    """
+    if not history or not len(index):
+        return None
+    if any(feedback_error(feedback, index.word_length) for _, feedback in history):
+        return None
+
+    codes = np.stack([index.row(guess) for guess, _ in history])
+    mismatches = np.zeros(len(index), dtype=np.int64)
+    for row, (_, feedback) in zip(codes, history):
+        mismatches += count_position_mismatches(row, encode_feedback(feedback), index.word_length)
+
+    fewest = mismatches.min()
+    closest = np.flatnonzero(mismatches == fewest)
+
+    # Words that share every pattern of the history lead to the same correction
+    groups = {}
+    for i in closest:
+        groups.setdefault(tuple(codes[:, i].tolist()), []).append(i)
+    corrected, members = max(groups.items(), key=lambda item: len(item[1]))
+
+    return {
+        "history": [(guess, decode_pattern(code, index.word_length)) for (guess, _), code in zip(history, corrected)],
+        "mismatches": int(fewest),
+        "words": [index.words[i] for i in members],
+    }
+
+
+def solve_state(word_logs, history, alternatives=0, opener=None, index=None):
+    """
+    Replays a guess/feedback history on a bucket and recommends the next guess.
+    `history` is a list of (guess, feedback) pairs; an empty history returns `opener`,
+    by default the word with the highest log score. `index` is the bucket's PatternIndex,
+    used to suggest a correction; by default it is built from `word_logs`.
+    Returns a dict with the guess, the number of remaining candidates and, when asked for,
+    the best `alternatives` other guesses with their scores.
+    """
+    possible_words = list(word_logs.keys())
+    word_length = len(possible_words[0]) if possible_words else 0
+    for _, feedback in history:
+        error = feedback_error(feedback, word_length)
+        if error:
+            return {"guess": None, "candidates": 0, "error": error}
+
+    for guess, feedback in history:
+        if feedback == "2" * len(guess):
+            return {"guess": guess, "candidates": 1, "solved": True, "alternatives": []}
+        possible_words = filter_words(possible_words, guess, feedback)
+
+    if not possible_words:
+        return {"guess": None, "candidates": 0, "error": "Geen woorden mogelijk, check of de feedback klopt.",
+                "suggestion": suggest_correction(PatternIndex(word_logs) if index is None else index, history)}
+
+    if history:
+        best_guess, scores = calculate_weighted_avg_log(possible_words, possible_words)
+    else:
+        best_guess, scores = opener or pick_best(word_logs), word_logs
+
+    others = []
+    if alternatives:
+        others = [[word, score] for word, score in Ranking(scores).top(alternatives, exclude=(best_guess,))]
+    return {"guess": best_guess, "candidates": len(possible_words), "alternatives": others}
@@ -0,0 +1,189 @@
+import argparse
+import asyncio
+import http.client
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from batch_solve import error_result, parse_state, plan_batch, preload_buckets, solve_chunk
+
+# Number of alternatives returned by /next when the request does not ask for a number
+DEFAULT_ALTERNATIVES = 5
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class SolverService:
+    """
+    Small HTTP/1.1 JSON service around the solver core. Connections are kept alive between
+    requests, buckets are preloaded in this process and in every pooled worker process.
+
+    POST /start  {"first_letter": "a", "length": 5}                 -> opener of the bucket
+    POST /next   {"first_letter": "a", "length": 5, "history": [...]} -> best guess and alternatives
+    POST /batch  {"states": [{...}, ...]}                           -> one result per state
+    GET  /health                                                    -> 200 when ready, 503 while preloading
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.executor = None
+        self.ready = False
+        self.preload_error = None
+        self._preload = None
+
+    async def start(self, host, port):
+        # Listen first, so health checks can see the service warming up
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=preload_buckets)
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        self._preload = asyncio.get_running_loop().create_task(self.preload())
+        return server
+
+    async def preload(self):
+        # Requests are served during the preload too; they load their bucket on demand
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, preload_buckets)
+        except Exception as error:
+            self.preload_error = str(error)
+        finally:
+            self.ready = True
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self.dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        routes = {"/start": self.start_game, "/next": self.next_guess, "/batch": self.batch}
+        if path == "/health":
+            health = {"ready": self.ready}
+            if self.preload_error:
+                health["error"] = self.preload_error
+            return (200 if self.ready else 503), health
+        if path not in routes:
+            return 404, {"error": f"Onbekend pad {path}"}
+        if method != "POST":
+            return 405, {"error": "Gebruik POST"}
+        try:
+            request = json.loads(body or b"{}")
+            return 200, await routes[path](request)
+        except (KeyError, TypeError, ValueError) as error:
+            return 400, {"error": f"Ongeldig verzoek: {error}"}
+        except Exception as error:
+            return 500, {"error": str(error)}
+
+    async def start_game(self, request):
+        # A bucket may still be preloading or have been evicted, and building it would block
+        # every connection, so the opener comes from a worker like the next guess
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            self.executor, solve_chunk, int(request["length"]), request["first_letter"].lower(), [[]],
+            int(request.get("alternatives", 0))
+        )
+        return results[0]
+
+    async def next_guess(self, request):
+        loop = asyncio.get_running_loop()
+        history = [tuple(step) for step in request.get("history", [])]
+        alternatives = int(request.get("alternatives", DEFAULT_ALTERNATIVES))
+        results = await loop.run_in_executor(
+            self.executor, solve_chunk, int(request["length"]), request["first_letter"].lower(), [history], alternatives
+        )
+        return results[0]
+
+    async def batch(self, request):
+        loop = asyncio.get_running_loop()
+        # A state that cannot be read gets its own error record instead of failing the request
+        states = [parse_state(state) for state in request["states"]]
+        alternatives = int(request.get("alternatives", 0))
+        unique, chunks = plan_batch(states)
+
+        futures = [
+            loop.run_in_executor(self.executor, solve_chunk, word_length, first_letter, [key[2] for key in keys], alternatives)
+            for word_length, first_letter, keys in chunks
+        ]
+        results = [error_result(state["error"]) if state.get("error") else None for state in states]
+        for (_, _, keys), chunk_results in zip(chunks, await asyncio.gather(*futures)):
+            for key, result in zip(keys, chunk_results):
+                for index in unique[key]:
+                    results[index] = result
+        return {"results": results}
+
+
+class SolverClient:
+    """
+    Client for the solver service that reuses one HTTP connection for all requests.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8600):
+        self.connection = http.client.HTTPConnection(host, port)
+
+    def post(self, path, payload):
+        self.connection.request("POST", path, json.dumps(payload), {"Content-Type": "application/json"})
+        response = self.connection.getresponse()
+        return json.loads(response.read())
+
+    def start(self, first_letter, length):
+        return self.post("/start", {"first_letter": first_letter, "length": length})
+
+    def next(self, first_letter, length, history, alternatives=DEFAULT_ALTERNATIVES):
+        return self.post("/next", {"first_letter": first_letter, "length": length,
+                                   "history": history, "alternatives": alternatives})
+
+    def batch(self, states, alternatives=0):
+        response = self.post("/batch", {"states": states, "alternatives": alternatives})
+        if "results" not in response:
+            raise RuntimeError(response.get("error", "Geen resultaten ontvangen"))
+        return response["results"]
+
+    def close(self):
+        self.connection.close()
+
+
+async def serve(host, port, workers):
+    server = await SolverService(workers).start(host, port)
+    print(f"LingoBeast solver service luistert op http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the LingoBeast solver as a local HTTP service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.workers))
+
+
+if __name__ == "__main__":
+    main()
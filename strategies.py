@@ -0,0 +1,44 @@
+import numpy as np
+
+from patterns import histogram_entropies, score_rows
+
+
+def expected_size(histograms):
+    """
+    Expected number of candidates left after the guess, negated so that higher is better.
+    """
+    return -(histograms.astype(np.float64) ** 2).sum(axis=1) / histograms.sum(axis=1)
+
+
+def minimax(histograms):
+    """
+    Size of the largest group of candidates the guess can leave, negated.
+    """
+    return -histograms.max(axis=1).astype(np.float64)
+
+
+def most_parts(histograms):
+    """
+    Number of different feedback patterns the guess can get.
+    """
+    return np.count_nonzero(histograms, axis=1).astype(np.float64)
+
+
+# Scoring policies by name; each maps pattern histograms (guesses x patterns) to one
+# score per guess, where the highest score is the best guess. Entropy is the weighted
+# average log of `calculate_weighted_avg_log`.
+STRATEGIES = {
+    "entropy": histogram_entropies,
+    "expected_size": expected_size,
+    "minimax": minimax,
+    "most_parts": most_parts,
+}
+
+
+def strategy_scores(codes, word_length, strategy="entropy"):
+    """
+    Scores every row of a pattern code matrix with a strategy (a name or a function).
+    """
+    if isinstance(strategy, str):
+        strategy = STRATEGIES[strategy]
+    return score_rows(codes, word_length, strategy)
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import metrics
+import residency
+from global_mode import load_dictionary, load_global_game
+from solver import FIRST_LETTERS
+
+# Memory the warm-up may fill, in MB, at most the budget of the residency manager;
+# buckets that do not fit are loaded on demand
+DEFAULT_BUDGET_MB = 256
+
+
+def bucket_size(word_length, first_letter):
+    """
+    Number of words in a bucket, or 0 when it has no logs.
+    """
+    prefix = "five" if word_length == 5 else "six"
+    try:
+        with open(f"{prefix}_letter_logs_{first_letter}.csv", "r", encoding="utf-8") as csvfile:
+            return sum(1 for _ in csvfile) - 1  # Without the header row
+    except FileNotFoundError:
+        return 0
+
+
+def popular_buckets():
+    """
+    The buckets to warm up, most popular first: LINGOBEAST_WARMUP_BUCKETS (e.g. "5s,6b,6k")
+    or else every bucket, largest first. "5" and "6" stand for the whole-dictionary games.
+    """
+    configured = os.environ.get("LINGOBEAST_WARMUP_BUCKETS")
+    if configured:
+        return [name.strip() for name in configured.split(",") if name.strip()]
+    buckets = [f"{word_length}{letter}" for word_length in (5, 6) for letter in FIRST_LETTERS]
+    sizes = {name: bucket_size(int(name[0]), name[1]) for name in buckets}
+    return sorted((name for name in buckets if sizes[name]), key=lambda name: -sizes[name]) + ["5", "6"]
+
+
+def estimate_bytes(name):
+    word_length = int(name[0])
+    if len(name) == 1:
+        return len(load_dictionary(word_length)) * (word_length + residency.WORD_OVERHEAD_BYTES)
+    return residency.estimate_bytes(bucket_size(word_length, name[1]), word_length)
+
+
+class WarmUp:
+    """
+    Loads buckets into the residency manager and builds whole-dictionary games on a thread
+    pool, in order of popularity and while they fit in the memory budget, and reports when
+    it is done.
+    """
+
+    def __init__(self, budget_bytes, names, workers):
+        self.budget_bytes = budget_bytes
+        self.names = names
+        self.workers = workers
+        self.buckets = []
+        self.global_games = {}
+        self.skipped = []
+        self.errors = {}
+        self.bytes_used = 0
+        self.status = "cold"
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.status = "warming"
+        self.started = time.time()
+        threading.Thread(target=self._run, name="warmup", daemon=True).start()
+
+    def _run(self):
+        try:
+            # Reserve the budget up front in order of popularity, then build concurrently
+            planned = []
+            reserved = 0
+            for name in self.names:
+                size = estimate_bytes(name)
+                if reserved + size > self.budget_bytes:
+                    self.skipped.append(name)
+                    continue
+                reserved += size
+                planned.append(name)
+
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="warmup") as executor:
+                list(executor.map(self._build, planned))
+        except Exception as e:
+            self.errors["warmup"] = f"{type(e).__name__}: {e}"
+        finally:
+            # Buckets that were not warmed up are loaded on demand, so never stay "warming"
+            self.finished = time.time()
+            self.status = "ready"
+
+    def _build(self, name):
+        word_length = int(name[0])
+        try:
+            with metrics.timer("warmup.build", bucket=name):
+                if len(name) == 1:
+                    index, table = load_global_game(word_length)
+                    with self._lock:
+                        self.global_games[word_length] = (index, table)
+                        self.bytes_used += estimate_bytes(name)
+                else:
+                    bucket = residency.manager().get(word_length, name[1])
+                    with self._lock:
+                        self.buckets.append(name)
+                        self.bytes_used += bucket.nbytes
+        except Exception as e:
+            self.errors[name] = f"{type(e).__name__}: {e}"
+
+    @property
+    def ready(self):
+        return self.status == "ready"
+
+    def report(self):
+        end = self.finished or time.time()
+        return {
+            "status": self.status,
+            "buckets": len(self.buckets) + len(self.global_games),
+            "planned": len(self.names) - len(self.skipped),
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "memory_mb": round(self.bytes_used / 2**20, 1),
+            "budget_mb": round(self.budget_bytes / 2**20, 1),
+            "seconds": round(end - self.started, 2) if self.started else 0.0,
+        }
+
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def start(budget_mb=None, names=None, workers=None):
+    """
+    Starts the warm-up once per process and returns it; later calls return the same one.
+    Defaults come from LINGOBEAST_WARMUP_MB, LINGOBEAST_WARMUP_BUCKETS and LINGOBEAST_WARMUP_WORKERS.
+    """
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None:
+            if budget_mb is None:
+                budget_mb = float(os.environ.get("LINGOBEAST_WARMUP_MB", DEFAULT_BUDGET_MB))
+            if workers is None:
+                workers = int(os.environ.get("LINGOBEAST_WARMUP_WORKERS", min(4, os.cpu_count() or 1)))
+            budget_bytes = min(int(budget_mb * 2**20), residency.manager().budget_bytes)
+            _warmup = WarmUp(budget_bytes, names or popular_buckets(), workers)
+            _warmup.start()
+    return _warmup
+
+
+def global_game(word_length):
+    """
+    The warmed-up (index, table) of a whole-dictionary game, or None.
+    """
+    if _warmup is None:
+        return None
+    return _warmup.global_games.get(word_length)
+
+
+class ReadinessHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        report = _warmup.report() if _warmup else {"status": "cold"}
+        body = json.dumps(report).encode("utf-8")
+        # Health checks only route traffic once this returns 200
+        self.send_response(200 if report["status"] == "ready" else 503)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_readiness(port, host="0.0.0.0"):
+    """
+    Answers every GET on `port` with the warm-up report: 503 while warming, 200 when ready.
+    """
+    server = ThreadingHTTPServer((host, port), ReadinessHandler)
+    threading.Thread(target=server.serve_forever, name="readiness", daemon=True).start()
+    return server
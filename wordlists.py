@@ -0,0 +1,216 @@
+import argparse
+import csv
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from patterns import PatternIndex, encode_words, entropies, pattern_matrix
+from ranking import Ranking
+from solver import FIRST_LETTERS
+
+# Characters a word may consist of; the Dutch IJ is one tile and written as "1"
+ALPHABET = frozenset("abcdefghijklmnopqrstuvwxyz1'-")
+
+# Directory of the ingested word lists, one file per word length and file contents
+CACHE_DIR = "wordlist_cache"
+
+# Part of the cache key; change it when the normalization rules change
+INGEST_VERSION = "lower/ij-as-1/alphabet-a-z1'-"
+
+
+def word_list_file(word_length, kind):
+    """
+    The .txt file of the "guesses" or the "solutions" of a word length.
+    """
+    prefix = "five" if word_length == 5 else "six"
+    return f"possible_{prefix}_letter_{kind}.txt"
+
+
+def normalize(word):
+    """
+    Lowercases a word and writes the IJ (also as the ligature) as "1".
+    """
+    return word.strip().lower().replace("ĳ", "1").replace("ij", "1")
+
+
+def ingest(lines, word_length):
+    """
+    Normalizes and deduplicates the lines of a word list in one pass, keeping the first
+    occurrence of every word in file order. Returns the words and the rejected lines:
+    words of another length or with characters outside the alphabet.
+    """
+    words = {}
+    rejected = []
+    for line in lines:
+        word = normalize(line)
+        if not word:
+            continue
+        if len(word) != word_length or not ALPHABET.issuperset(word):
+            rejected.append(line.strip())
+            continue
+        words.setdefault(word, None)
+    return list(words), rejected
+
+
+def partition(encoded):
+    """
+    Orders encoded words by first letter, stable within a letter.
+    Returns the order and, per letter of FIRST_LETTERS, the start of its words (plus the end).
+    """
+    if not len(encoded):
+        return np.zeros(0, dtype=np.intp), np.zeros(len(FIRST_LETTERS) + 1, dtype=np.intp)
+    letters = np.frombuffer(FIRST_LETTERS.encode("latin-1"), dtype=np.uint8)
+    rank = np.full(256, len(letters), dtype=np.intp)  # Other first characters go last
+    rank[letters] = np.arange(len(letters))
+    first = rank[encoded[:, 0]]
+    order = np.argsort(first, kind="stable")
+    bounds = np.searchsorted(first[order], np.arange(len(letters) + 1))
+    return order, bounds
+
+
+class WordLists:
+    """
+    The guesses and solutions of one word length, normalized, deduplicated and partitioned
+    by first letter, as encoded (words x letters) arrays. Words are decoded on request.
+    """
+
+    def __init__(self, word_length, arrays):
+        self.word_length = word_length
+        self.arrays = arrays
+        self._words = {}
+
+    @property
+    def rejected(self):
+        return self.arrays["rejected"].tolist()
+
+    def encoded(self, kind, first_letter=None):
+        """
+        The encoded "guesses" or "solutions", in file order or only those of one first letter.
+        """
+        encoded = self.arrays[kind]
+        if first_letter is None:
+            return encoded
+        start, end = self._bounds(kind, first_letter)
+        return encoded[self.arrays[f"{kind}_order"][start:end]]
+
+    def words(self, kind, first_letter=None):
+        key = (kind, first_letter)
+        if key not in self._words:
+            encoded = self.encoded(kind, first_letter)
+            self._words[key] = encoded.view(f"S{self.word_length}").ravel().astype(str).tolist() if len(encoded) else []
+        return self._words[key]
+
+    def guesses(self, first_letter=None):
+        return self.words("guesses", first_letter)
+
+    def solutions(self, first_letter=None):
+        return self.words("solutions", first_letter)
+
+    def _bounds(self, kind, first_letter):
+        bounds = self.arrays[f"{kind}_bounds"]
+        i = FIRST_LETTERS.index(first_letter)
+        return bounds[i], bounds[i + 1]
+
+
+def build_arrays(word_length, contents):
+    """
+    Ingests the raw guesses and solutions files ({kind: bytes}) into the cached arrays.
+    """
+    arrays = {}
+    rejected = []
+    for kind, data in contents.items():
+        words, kind_rejected = ingest(data.decode("utf-8").splitlines(), word_length)
+        rejected += kind_rejected
+        encoded = encode_words(words).reshape(len(words), word_length)
+        arrays[kind] = encoded
+        arrays[f"{kind}_order"], arrays[f"{kind}_bounds"] = partition(encoded)
+    arrays["rejected"] = np.array(rejected, dtype=str)
+    return arrays
+
+
+_word_lists = {}
+
+
+def load_word_lists(word_length, cache_dir=CACHE_DIR):
+    """
+    The ingested word lists of a word length. The result is cached on disk by a hash of
+    both .txt files, so the lists are only ingested again when a file changes.
+    """
+    contents = {}
+    for kind in ("guesses", "solutions"):
+        with open(word_list_file(word_length, kind), "rb") as f:
+            contents[kind] = f.read()
+    digest = hashlib.sha256(b"\0".join([INGEST_VERSION.encode("utf-8"), *contents.values()])).hexdigest()
+
+    key = (word_length, digest)
+    if key in _word_lists:
+        return _word_lists[key]
+
+    path = os.path.join(cache_dir, f"{word_length}-{digest[:16]}.npz")
+    if not os.path.exists(path):
+        arrays = build_arrays(word_length, contents)
+        # Write to a temporary file first, so a reader never sees half a cache file
+        os.makedirs(cache_dir, exist_ok=True)
+        handle, partial = tempfile.mkstemp(dir=cache_dir, suffix=".npz")
+        with os.fdopen(handle, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(partial, path)
+
+    with np.load(path) as data:
+        word_lists = WordLists(word_length, {name: data[name] for name in data.files})
+    _word_lists[key] = word_lists
+    return word_lists
+
+
+def bucket_index(word_length, first_letter, words):
+    """
+    A PatternIndex over `words`, for example the keys of a bucket's logs in that order, built
+    on the ingested encoded guesses of the bucket. Words the word lists reject are left out,
+    and a first letter without a bucket gives an empty index.
+    """
+    word_lists = load_word_lists(word_length)
+    if len(first_letter) != 1 or first_letter not in FIRST_LETTERS:
+        return PatternIndex([], np.zeros((0, word_length), dtype=np.uint8))
+    position = {word: i for i, word in enumerate(word_lists.guesses(first_letter))}
+    kept = [word for word in words if word in position]
+    encoded = word_lists.encoded("guesses", first_letter)[[position[word] for word in kept]]
+    return PatternIndex(kept, encoded.reshape(len(kept), word_length))
+
+
+def write_bucket_logs(word_length, first_letter):
+    """
+    Scores every ingested guess of a bucket against the bucket's ingested solutions and saves
+    the weighted average logs, best first, as the bucket's logs file.
+    """
+    word_lists = load_word_lists(word_length)
+    scores = entropies(pattern_matrix(word_lists.encoded("guesses", first_letter),
+                                      word_lists.encoded("solutions", first_letter)), word_length)
+    ranked = Ranking(dict(zip(word_lists.guesses(first_letter), scores.tolist()))).ranked()
+
+    prefix = "five" if word_length == 5 else "six"
+    output_file = f"{prefix}_letter_logs_{first_letter}.csv"
+    with open(output_file, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Guess", "Weighted Avg Log"])
+        writer.writerows(ranked)
+    return output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest the word lists and report what validation rejects.")
+    parser.add_argument("--logs", action="append", metavar="BUCKET",
+                        help="rebuild the logs of a bucket (e.g. 6f) from the ingested lists")
+    args = parser.parse_args()
+
+    for length in (5, 6):
+        lists = load_word_lists(length)
+        print(f"{length} letters: {len(lists.guesses())} guesses, {len(lists.solutions())} solutions, "
+              f"{len(lists.rejected)} rejected {lists.rejected[:10]}")
+    for name in args.logs or []:
+        print(f"Logs saved to {write_bucket_logs(int(name[0]), name[1])}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from patterns import entropies, pattern_histograms
+from solver import FIRST_LETTERS, load_precomputed_logs, opening_guess, pick_best_index
+from wordlists import bucket_index
+
+# Number of guesses the minimax search tries in every state, best first
+DEFAULT_WIDTH = 5
+
+
+def split(codes, candidates):
+    """
+    Splits the candidates by the pattern the guess gives them.
+    Returns (pattern code, candidate indices) per pattern, largest group first.
+    """
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+    groups = [(int(group_codes[0]), candidates[group]) for group_codes, group in
+              zip(np.split(sorted_codes, bounds), np.split(order, bounds))]
+    return sorted(groups, key=lambda group: -len(group[1]))
+
+
+def policy_depths(matrix, candidates, choose, depth=1, depths=None):
+    """
+    Plays every candidate as the solution at once by walking the decision tree of a policy.
+    `choose(candidates)` returns the index of the word to guess in that state.
+    Returns {solution index: number of guesses needed}.
+    """
+    if depths is None:
+        depths = {}
+    guess = choose(candidates)
+    solved = matrix[guess, guess]  # All green
+    for code, group in split(matrix[guess, candidates], candidates):
+        if code == solved and guess in group:
+            depths[guess] = depth
+            group = group[group != guess]
+            if not len(group):
+                continue
+        if len(group) == len(candidates):
+            # The guess does not split the candidates any further, give up on them
+            for i in group:
+                depths[int(i)] = float("inf")
+            continue
+        policy_depths(matrix, group, choose, depth + 1, depths)
+    return depths
+
+
+def current_policy(matrix, word_length, opener, words):
+    """
+    The policy of the solver: the bucket's opener, then the candidate with the
+    highest weighted average log against the other candidates, ties broken like `pick_best`.
+    """
+    def choose(candidates):
+        if len(candidates) == matrix.shape[0]:
+            return opener
+        scores = entropies(matrix[np.ix_(candidates, candidates)], word_length)
+        return int(candidates[pick_best_index([words[i] for i in candidates], scores)])
+    return choose
+
+
+class MinimaxSearch:
+    """
+    Searches for guesses that minimize the worst-case number of guesses. Any word of the
+    bucket may be guessed; per state only the `width` guesses with the smallest largest
+    partition are tried, and results are memoized per candidate set.
+    """
+
+    def __init__(self, matrix, word_length, width=DEFAULT_WIDTH):
+        self.matrix = matrix
+        self.word_length = word_length
+        self.width = width
+        self.memo = {}
+        self.lower_bounds = {}
+        self.solved = 3 ** word_length - 1
+
+    def worst_case(self, candidates, bound=float("inf")):
+        """
+        Returns (worst-case guesses, guess) for the candidate set. Branches that cannot
+        beat `bound` are cut off early.
+        """
+        if len(candidates) == 1:
+            return 1, int(candidates[0])
+        if len(candidates) == 2:
+            return 2, int(candidates[0])
+        key = candidates.tobytes()
+        if key in self.memo:
+            return self.memo[key]
+        if key in self.lower_bounds and self.lower_bounds[key] >= bound:
+            return self.lower_bounds[key], int(candidates[0])
+
+        codes = self.matrix[:, candidates]
+        histograms = pattern_histograms(codes, self.word_length)
+        largest = histograms.max(axis=1)
+        is_candidate = np.zeros(self.matrix.shape[0], dtype=bool)
+        is_candidate[candidates] = True
+        # Smallest largest partition first, candidates (that can win right away) before others
+        order = np.lexsort((~is_candidate, largest))
+        tries = [g for g in order[:self.width * 2] if largest[g] < len(candidates)][:self.width]
+
+        best = (float("inf"), int(candidates[0]))
+        for guess in tries:
+            worst = 1
+            for code, group in split(codes[guess], candidates):
+                if code == self.solved:
+                    continue
+                depth, _ = self.worst_case(group, min(bound, best[0]) - 1)
+                worst = max(worst, depth + 1)
+                if worst >= min(bound, best[0]):
+                    break
+            if worst < best[0]:
+                best = (worst, int(guess))
+
+        if best[0] < bound:
+            self.memo[key] = best
+        else:
+            # Every guess was cut off, so the result is only a lower bound
+            self.lower_bounds[key] = bound
+        return best
+
+    def choose(self, candidates):
+        return self.worst_case(candidates)[1]
+
+
+def analyze_bucket(word_length, first_letter, width=DEFAULT_WIDTH):
+    """
+    Computes the depth of every solution of a bucket under the current policy and under
+    the minimax policy. Returns a dict with the worst cases and depth histograms.
+    """
+    start = time.perf_counter()
+    word_logs = load_precomputed_logs(first_letter, word_length)
+    index = bucket_index(word_length, first_letter, word_logs)
+    matrix = index.matrix(index.words)
+    candidates = np.arange(len(index))
+    opener = index.position[opening_guess(first_letter, word_length, word_logs)]
+
+    policy = policy_depths(matrix, candidates, current_policy(matrix, word_length, opener, index.words))
+    search = MinimaxSearch(matrix, word_length, width)
+    minimax_worst, minimax_opener = search.worst_case(candidates)
+    minimax = policy_depths(matrix, candidates, search.choose)
+
+    return {
+        "bucket": first_letter,
+        "words": len(index),
+        "policy_max": max(policy.values()),
+        "policy_mean": sum(policy.values()) / len(policy),
+        "policy_histogram": Counter(policy.values()),
+        "minimax_max": minimax_worst,
+        "minimax_mean": sum(minimax.values()) / len(minimax),
+        "minimax_opener": index.words[minimax_opener],
+        "minimax_histogram": Counter(minimax.values()),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def analyze_worst_cases(word_length, workers=None, width=DEFAULT_WIDTH):
+    """
+    Runs `analyze_bucket` for every bucket of a word length in parallel and writes the
+    per-bucket worst cases and depth histograms to CSV.
+    """
+    buckets = [letter for letter in FIRST_LETTERS if os.path.exists(
+        f"{'five' if word_length == 5 else 'six'}_letter_logs_{letter}.csv")]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        reports = list(executor.map(analyze_bucket, [word_length] * len(buckets), buckets, [width] * len(buckets)))
+
+    output_file = f"worst_case_{word_length}_letters.csv"
+    with open(output_file, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Bucket", "Words", "Policy Max", "Policy Mean", "Minimax Max", "Minimax Mean", "Minimax Opener"])
+        for report in reports:
+            writer.writerow([report["bucket"], report["words"], report["policy_max"], round(report["policy_mean"], 4),
+                             report["minimax_max"], round(report["minimax_mean"], 4), report["minimax_opener"]])
+
+    histogram_file = f"depth_histogram_{word_length}_letters.csv"
+    with open(histogram_file, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Bucket", "Policy", "Number of Guesses", "Frequency"])
+        for report in reports:
+            for policy in ("policy", "minimax"):
+                for depth, frequency in sorted(report[f"{policy}_histogram"].items()):
+                    writer.writerow([report["bucket"], policy, depth, frequency])
+
+    for report in reports:
+        print(f"{word_length}{report['bucket']}: {report['words']} words, worst case {report['policy_max']} "
+              f"(minimax {report['minimax_max']} with {report['minimax_opener'].upper()}) "
+              f"in {report['seconds']:.1f} s")
+    print(f"Worst cases saved to {output_file}, depth histograms to {histogram_file}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worst-case number of guesses per bucket.")
+    parser.add_argument("--length", type=int, choices=[5, 6], action="append", help="word length(s) to analyze")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH, help="guesses tried per state by the minimax search")
+    args = parser.parse_args()
+
+    for word_length in args.length or [5, 6]:
+        analyze_worst_cases(word_length, args.workers, args.width)
+
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(10000)
+    main()